@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""Benchmark of the per-command dispatch overhead of the console: lines
+go through precmd() and onecmd() like in cmdloop(), against commands
+that do almost no storage work
+
+Usage:
+    python3 -m benchmarks.bench_console [commands]
+"""
+import io
+import sys
+from contextlib import redirect_stdout
+from time import perf_counter
+from console import HBNBCommand
+
+LINES = {
+    "classic": ('show User 1234', 'count User',
+                'update User 1234 first_name "Betty"'),
+    "dotted": ('User.show("1234")', 'User.count()',
+               'User.update("1234", "first_name", "Betty")'),
+    "dotted dict": ('User.update("1234", {"first_name": "Betty", '
+                    '"age": 89})',),
+}
+
+
+if __name__ == "__main__":
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    console = HBNBCommand()
+    print(f"{commands} commands per syntax")
+    for syntax, lines in LINES.items():
+        lines = [lines[n % len(lines)] for n in range(commands)]
+        with redirect_stdout(io.StringIO()):
+            start = perf_counter()
+            for line in lines:
+                console.onecmd(console.precmd(line))
+            elapsed = perf_counter() - start
+        print(f"{syntax:<12} {elapsed:7.3f} s "
+              f"{elapsed / commands * 1e6:7.2f} us/command")
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""Benchmark of a full reload of file.json and of a save that rewrites
+every record, the two paths that parse and format created_at/updated_at
+
+Usage:
+    python3 -m benchmarks.bench_dates [count]
+"""
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+def file_storage(path):
+    """returns an empty storage of path"""
+    storage = FileStorage()
+    storage._FileStorage__objects = {}
+    storage._FileStorage__dirty = set()
+    storage._FileStorage__cache = {}
+    storage.set_format("json", path)
+    return storage
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "file.json")
+    try:
+        storage = file_storage(path)
+        for n in range(count):
+            storage.new(User(email=f"{n}@mail.com"))
+        storage.flush()
+
+        storage = file_storage(path)
+        start = perf_counter()
+        storage.reload()
+        reload = perf_counter() - start
+        for obj in storage.all().values():
+            obj.first_name = "Betty"
+        start = perf_counter()
+        storage.flush()
+        save = perf_counter() - start
+        print(f"{count} users")
+        print(f"reload {reload * 1000:9.1f} ms {count / reload:10.0f} /s")
+        print(f"save   {save * 1000:9.1f} ms {count / save:10.0f} /s")
+    finally:
+        shutil.rmtree(directory)
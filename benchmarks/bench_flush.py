@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""Benchmark of the console `create` latency as the dataset grows, with
+save() writing the file itself or handing it to the background flusher
+
+Usage:
+    python3 -m benchmarks.bench_flush [commands]
+"""
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from time import perf_counter
+from console import HBNBCommand
+from models import storage
+from models.base_model import BaseModel
+
+SIZES = (1000, 10000, 50000)
+
+
+def median_create(commands):
+    """returns the median duration of commands `create Place`"""
+    console = HBNBCommand()
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for _ in range(commands):
+            start = perf_counter()
+            console.onecmd("create Place")
+            times.append(perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+if __name__ == "__main__":
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    directory = tempfile.mkdtemp()
+    storage.set_format("json", os.path.join(directory, "file.json"))
+    print(f"{'objects':>8} {'synchronous':>14} {'background':>14}")
+    for size in SIZES:
+        while storage.count() < size:
+            storage.new(BaseModel(id=str(storage.count())))
+        storage.flush()
+        sync = median_create(commands)
+        storage.start_flusher()
+        background = median_create(commands)
+        storage.close()
+        print(f"{size:>8} {sync * 1000:11.3f} ms {background * 1000:11.3f} ms")
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Memory benchmark of the regular and compact model layouts
+
+Usage:
+    python3 -m benchmarks.bench_memory [count]
+"""
+import json
+import sys
+import tracemalloc
+from models.compact import compact, declared_fields
+from models.place import Place
+from models.user import User
+
+
+def measure(cls, records, touch_dict=False):
+    """returns the bytes still allocated per instance built from records
+    decoded while measuring, as reload() builds them: the strings an
+    instance keeps from its record are counted, the rest is freed"""
+    lines = [json.dumps(record) for record in records]
+    tracemalloc.start()
+    objects = [cls(**json.loads(line)) for line in lines]
+    if touch_dict:
+        for obj in objects:
+            str(obj)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(objects)
+
+
+def records_of(cls, count):
+    """returns count to_dict() records of cls with every declared field
+    set, as objects filled in through the console end up"""
+    template = cls().to_dict()
+    for name, value in declared_fields(cls).items():
+        template[name] = type(value)(value)
+    records = []
+    for n in range(count):
+        record = template.copy()
+        record["id"] = f"{n:08d}-0000-4000-8000-000000000000"
+        records.append(record)
+    return records
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'class':<10}{'layout':<10}{'bytes/object':>14}"
+          f"{'after str()':>14}")
+    for cls in (Place, User):
+        records = records_of(cls, count)
+        for layout, build in (("regular", cls), ("compact", compact(cls))):
+            print(f"{cls.__name__:<10}{layout:<10}"
+                  f"{measure(build, records):>14.1f}"
+                  f"{measure(build, records, True):>14.1f}")
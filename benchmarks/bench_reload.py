@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""Benchmark of a sharded reload read in this process or decoded by a
+pool of worker processes
+
+Usage:
+    python3 -m benchmarks.bench_reload [count] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+BUCKETS = 32
+
+
+def sharded_storage(directory):
+    """returns an empty storage of directory"""
+    storage = FileStorage()
+    storage._FileStorage__objects = {}
+    storage._FileStorage__dirty = set()
+    storage._FileStorage__cache = {}
+    storage.enable_shards(directory, BUCKETS)
+    return storage
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    directory = tempfile.mkdtemp()
+    try:
+        storage = sharded_storage(directory)
+        for n in range(count):
+            cls = Place if n % 2 else User
+            storage.new(cls(id=str(n), name=f"name {n}"))
+        storage.save()
+        print(f"{count} objects in {BUCKETS} buckets per class, "
+              f"{os.cpu_count()} cores")
+        for label, pool in (("sequential", 1), (f"{workers} workers",
+                                                workers)):
+            storage = sharded_storage(directory)
+            start = perf_counter()
+            storage.reload(workers=pool)
+            elapsed = perf_counter() - start
+            assert storage.count() == count
+            print(f"{label:<12} {elapsed * 1000:9.1f} ms")
+    finally:
+        shutil.rmtree(directory)
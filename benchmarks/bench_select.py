@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""Benchmark of numeric Place filtering: loop over instances against
+Columns.select
+
+Usage:
+    python3 -m benchmarks.bench_select [count]
+"""
+import random
+import sys
+from time import perf_counter
+from models.engine import columns as columns_module
+from models.engine.columns import Columns
+from models.place import Place
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(0)
+    places = {}
+    columns = Columns("Place", Place.columnar_attributes)
+    for n in range(count):
+        place = Place.__new__(Place)
+        place.__dict__.update(price_by_night=rng.randrange(20, 400),
+                              max_guest=rng.randrange(1, 10))
+        key = f"Place.{n}"
+        places[key] = place
+        columns.set(key, [getattr(place, name)
+                          for name in Place.columnar_attributes])
+
+    start = perf_counter()
+    expected = [key for key, place in places.items()
+                if place.price_by_night < 100 and place.max_guest >= 4]
+    loop = perf_counter() - start
+    print(f"object loop       {loop * 1000:9.1f} ms  {len(expected)} rows")
+
+    predicates = [("price_by_night", "<", 100), ("max_guest", ">=", 4)]
+    backends = [("array", None)]
+    if columns_module.numpy is not None:
+        backends.insert(0, ("numpy", columns_module.numpy))
+    for name, backend in backends:
+        columns_module.numpy = backend
+        start = perf_counter()
+        keys = columns.select(predicates)
+        elapsed = perf_counter() - start
+        assert keys == expected
+        print(f"columns ({name:<5})   {elapsed * 1000:9.1f} ms  "
+              f"{len(keys)} rows")
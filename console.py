@@ -11,11 +11,23 @@ Commands:
     all - displays all instances of a class
     destroy - destroys an instance of a class
     update - updates an instance of a class
+    near - displays the instances of a class around a location
+    query - displays the instances of a class matching predicates
+    export - writes instances to a JSON Lines file
+    import - creates instances from a JSON Lines file
+Batch mode (one transaction, a single write of the file at the end):
+    ./console.py --batch [script]
 """
+import ast
 import cmd
+import io
+import json
+import os
 import re
-import shlex
-import ast
+import sys
+from contextlib import redirect_stdout
+from itertools import islice
+from time import perf_counter
 from models import storage
 from models.base_model import BaseModel
 from models.user import User
@@ -36,6 +48,103 @@ current_classes = {
     'Review': Review
 }
 
+# <Class name>.<method name>(<arguments>)
+_CALL = re.compile(r'(\w+)\.(\w+)\((.*)\)')
+# one argument: "double quoted", 'single quoted', a {...} dictionary or a
+# word, which may contain quoted parts (name="Le Loft"), each optionally
+# followed by a comma
+_TOKEN = re.compile(r'"([^"]*)"|\'([^\']*)\'|(\{.*?\})'
+                    r'|([^\s,"\'{](?:[^\s"\']|"[^"]*"|\'[^\']*\')*?'
+                    r'|[^\s,]\S*?)(?=,?(?:\s|$))')
+# one query predicate: <attribute><operator><value>
+_PREDICATE = re.compile(r'(\w+)(<=|>=|!=|==|<|>|=)(.*)', re.S)
+_DICT = 3
+
+
+class Command:
+    """A parsed console line: the name of its do_<name> method, the
+    positional arguments, class name first, and the attributes of a
+    {...} argument (None without one)"""
+
+    __slots__ = ("name", "args", "attributes")
+
+    def __init__(self, name, args, attributes=None):
+        """
+        Initialize the command
+        Args:
+            name (str): command name, e.g. "update"
+            args (list): positional arguments
+            attributes (dict): key/value pairs of a {...} argument
+        """
+        self.name = name
+        self.args = args
+        self.attributes = attributes
+
+    def __repr__(self):
+        """returns the command as a constructor call"""
+        return f"Command({self.name!r}, {self.args!r}, {self.attributes!r})"
+
+
+def tokenize(text):
+    """
+    Splits the arguments of a command in a single pass: words separated
+    by spaces and/or commas, "double" or 'single' quoted strings, and a
+    {...} dictionary
+    Returns:
+        tuple: list of the arguments, dict of a {...} argument or None
+    """
+    args = []
+    attributes = None
+    for match in _TOKEN.finditer(text):
+        value = match.group(match.lastindex)
+        if match.lastindex == _DICT:
+            try:
+                # JSON is the usual spelling and is parsed far faster
+                value = json.loads(value)
+            except ValueError:
+                try:
+                    value = ast.literal_eval(value)
+                except (ValueError, SyntaxError):
+                    pass
+            if type(value) is dict:
+                attributes = value
+                continue
+            value = match.group(_DICT)
+        args.append(value)
+    return args, attributes
+
+
+def parse_call(line):
+    """returns the Command of a <Class name>.<method name>(...) line,
+    or None for another syntax"""
+    match = _CALL.search(line)
+    if match is None:
+        return None
+    class_name, name, text = match.groups()
+    args, attributes = tokenize(text)
+    args.insert(0, class_name)
+    return Command(name, args, attributes)
+
+
+def parse(line):
+    """returns the Command of a line in either syntax, or None for an
+    empty line"""
+    command = parse_call(line)
+    if command is not None:
+        return command
+    name, _, text = line.strip().partition(" ")
+    if not name:
+        return None
+    return Command(name, *tokenize(text))
+
+
+def command_of(name, arg):
+    """returns arg if it is already a Command, else the Command of the
+    arguments of a classic `name <arguments>` line"""
+    if isinstance(arg, Command):
+        return arg
+    return Command(name, *tokenize(arg))
+
 
 class HBNBCommand(cmd.Cmd):
     """
@@ -45,6 +154,52 @@ class HBNBCommand(cmd.Cmd):
 
     prompt = "(hbnb) "
 
+    def run_batch(self, lines):
+        """
+        Runs a script of commands under one storage transaction, so the
+        file is written once at the end instead of on every command.
+        Blank lines and # comments are skipped, error messages go to
+        stderr prefixed with their line number and a summary with the
+        elapsed time is printed to stderr at the end
+        Args:
+            lines (iterable): command lines, e.g. an open file
+        Returns:
+            int: number of commands that reported an error
+        """
+        commands = errors = 0
+        start = perf_counter()
+        with storage.transaction():
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                commands += 1
+                output = io.StringIO()
+                stop = False
+                try:
+                    with redirect_stdout(output):
+                        stop = self.onecmd(self.precmd(line))
+                except Exception as error:
+                    output.write(f"** {type(error).__name__}: {error} **\n")
+                failed = False
+                try:
+                    for text in output.getvalue().splitlines(keepends=True):
+                        if text.startswith("** "):
+                            failed = True
+                            sys.stderr.write(f"line {number}: {text}")
+                        else:
+                            sys.stdout.write(text)
+                except BrokenPipeError:
+                    silence_stdout()
+                    stop = True
+                errors += failed
+                if stop:
+                    break
+        elapsed = perf_counter() - start
+        print(f"{commands} commands, {errors} errors in {elapsed:.3f} s",
+              file=sys.stderr)
+        return errors
+
     def precmd(self, arg):
         """
         Pre-process the command line before it is interpreted.
@@ -54,35 +209,13 @@ class HBNBCommand(cmd.Cmd):
         if not arg or arg == '':
             return '\n'
 
-        pattern = re.compile(r'(\w+)\.(\w+)\((.*)\)')
-        tuple_match = pattern.findall(arg)
-        if not tuple_match:
+        command = parse_call(arg)
+        if command is None:
             return super().precmd(arg)
 
-        match_list = tuple_match[0]
-        if not match_list[1] or not hasattr(self, 'do_' + match_list[1]):
-            return '\n'
-
-        all_args = [match_list[1], match_list[0]]
-        if len(match_list) > 2 and match_list[2] != '':
-            dict_pattern = re.compile(r'\{.+?\}')
-            dict_match = dict_pattern.search(match_list[2])
-            if dict_match:
-                uuid_pattern = re.compile(r'"([^"]*)"')
-                uuid_match = uuid_pattern.search(match_list[2])
-                if uuid_match:
-                    all_args.append(uuid_match.group(1))
-                    all_args.append(dict_match.group(0))
-            else:
-                args = [arg.rstrip(',') for arg in shlex.split(match_list[2])]
-                all_args.extend(args)
-
-        if len(all_args) > 4 and ' ' in all_args[4]:
-            args[2] = args[2].replace(' ', '_')
-
-        args_str = ' '.join(all_args[1:])
-        method_name = 'do_' + all_args[0]
-        getattr(self, method_name)(args_str)
+        method = getattr(self, 'do_' + command.name, None)
+        if method is not None:
+            method(command)
         return '\n'
 
     def default(self, arg):
@@ -91,16 +224,15 @@ class HBNBCommand(cmd.Cmd):
 
     def do_count(self, arg):
         """Returns count of all Instances of a class"""
-        args = shlex.split(arg)
-        intance = storage.all()
-        print(len([x for x in intance if x.startswith(args[0])]))
+        args = command_of('count', arg).args
+        print(storage.count(args[0]))
 
     def do_create(self, arg):
         """
         Creates a new instance of BaseModel
         Usage:  create <class name>
         """
-        args = shlex.split(arg)
+        args = command_of('create', arg).args
         if not validate_classname(args):
             return
         new_instance = current_classes[args[0]]()
@@ -112,12 +244,12 @@ class HBNBCommand(cmd.Cmd):
         Prints the string representation of an instance
         Usage:  show <class name> <id>
         """
-        args = shlex.split(arg)
+        args = command_of('show', arg).args
         if not validate_classname(args, check_id=True):
             return
-        key = f"{args[0]}.{args[1]}"
-        if key in storage.all():
-            print(storage.all()[key])
+        obj = storage.get(args[0], args[1])
+        if obj is not None:
+            print(obj)
         else:
             print("** no instance found **")
 
@@ -126,83 +258,191 @@ class HBNBCommand(cmd.Cmd):
         Deletes an instance from the storage
         Usage:  destroy <class name> <id>
         """
-        args = shlex.split(arg)
+        args = command_of('destroy', arg).args
         if not validate_classname(args, check_id=True):
             return
-        key = f"{args[0]}.{args[1]}"
-        if key in storage.all():
-            del (storage.all()[key])
+        obj = storage.get(args[0], args[1])
+        if obj is not None:
+            storage.delete(obj)
             storage.save()
         else:
             print("** no instance found **")
 
     def do_all(self, arg):
         """
-        Prints all string representations of all instances
+        Prints all string representations of all instances, as a list
+        written one instance at a time
         Usage:  all
                 all <class name>
+                all [<class name>] [limit=<n>] [offset=<n>] [after=<key>]
+        after=<Class name>.<id> starts after that instance, e.g. the last
+        one of the previous page
         """
-        args = shlex.split(arg)
-        str_list = []
-        if not args:
-            for key in storage.all():
-                str_list.append(str(storage.all()[key]))
-        elif validate_classname(args):
-            for key in storage.all():
-                if key.startswith(args[0]):
-                    str_list.append(str(storage.all()[key]))
+        args, options = split_options(command_of('all', arg).args,
+                                      ("limit", "offset", "after"))
+        if options is None or args and not validate_classname(args):
+            return
+        try:
+            objects = storage.scan(args[0] if args else None,
+                                   options.get("after"))
+        except KeyError:
+            print("** no instance found **")
+            return
+        offset = int(options.get("offset", 0))
+        limit = options.get("limit")
+        stop = None if limit is None else offset + int(limit)
+        return write_list(str(obj) for obj in islice(objects, offset, stop))
+
+    def do_query(self, arg):
+        """
+        Prints the instances of a class matching every predicate, as a
+        list like all, or their selected fields as dicts
+        Usage:  query <class name> [<attribute><operator><value> ...]
+                      [fields=<name>,...] [order=[-]<name>,...]
+                      [limit=<n>] [offset=<n>]
+        Operators: = == != < <= > >=; values are converted to the type of
+        the class attribute, quote them to keep spaces; -name in order
+        sorts in descending order, e.g.
+            query Place city_id=0001 price_by_night<80 order=price_by_night
+        """
+        args, options = split_options(
+            command_of('query', arg).args,
+            ("fields", "order", "limit", "offset"))
+        if options is None or not validate_classname(args):
+            return
+        cls = current_classes[args[0]]
+        predicates = []
+        for text in args[1:]:
+            match = _PREDICATE.fullmatch(text)
+            if match is None:
+                print(f"** invalid predicate: {text} **")
+                return
+            attribute, op, value = match.groups()
+            try:
+                value = query_value(cls, attribute, value)
+            except ValueError:
+                print(f"** invalid value for {attribute}: {value} **")
+                return
+            predicates.append((attribute, "==" if op == "=" else op, value))
+        fields, order = (
+            unquote(options[name]).split(",") if name in options else None
+            for name in ("fields", "order"))
+        limit = options.get("limit")
+        try:
+            objects = storage.query(
+                cls, *predicates, fields=fields, order=order,
+                limit=None if limit is None else int(limit),
+                offset=int(options.get("offset", 0)))
+        except ValueError as error:
+            print(f"** {error} **")
+            return
+        if fields is None:
+            objects = (str(obj) for obj in objects)
+        return write_list(objects)
+
+    def do_where(self, arg):
+        """
+        Same as query, for the <class name>.where(...) form
+        Usage:  <class name>.where(<attribute><operator><value>, ...)
+        """
+        return self.do_query(command_of('where', arg))
+
+    def do_near(self, arg):
+        """
+        Prints the instances of a class around a location, nearest first
+        Usage:  near <class name> <latitude> <longitude> <radius in km>
+                near <class name> <latitude> <longitude> nearest <count>
+                near <class name> box <south> <west> <north> <east>
+        """
+        args = command_of('near', arg).args
+        if not validate_classname(args):
+            return
+        if not getattr(current_classes[args[0]], "spatial_attributes", ()):
+            print("** class has no location **")
+            return
+        try:
+            if len(args) == 6 and args[1] == "box":
+                objects = storage.within(args[0], *map(float, args[2:]))
+            elif len(args) == 5 and args[3] == "nearest":
+                objects = storage.nearest(args[0], float(args[1]),
+                                          float(args[2]), int(args[4]))
+            elif len(args) == 4:
+                objects = storage.near(args[0], *map(float, args[1:]))
+            else:
+                print("** location missing **")
+                return
+        except ValueError:
+            print("** invalid location **")
+            return
+        str_list = [str(obj) for obj in objects.values()]
         if str_list:
             print(str_list)
 
+    def do_export(self, arg):
+        """
+        Writes all instances, or those of a class, to a JSON Lines file,
+        one to_dict() per line, and prints their number
+        Usage:  export <file name>
+                export <file name> <class name>
+        """
+        args = command_of('export', arg).args
+        if not args:
+            print("** file name missing **")
+            return
+        if len(args) > 1 and not validate_classname(args[1:]):
+            return
+        try:
+            print(storage.export_jsonl(args[0],
+                                       args[1] if len(args) > 1 else None))
+        except OSError as error:
+            print(f"** {error.strerror}: {args[0]} **")
+
+    def do_import(self, arg):
+        """
+        Creates or replaces the instances of a JSON Lines file, saved
+        once at the end, and prints their number
+        Usage:  import <file name>
+        """
+        args = command_of('import', arg).args
+        if not args:
+            print("** file name missing **")
+            return
+        try:
+            print(storage.import_jsonl(args[0]))
+        except OSError as error:
+            print(f"** {error.strerror}: {args[0]} **")
+        except ValueError as error:
+            print(f"** {error} **")
+
     def do_update(self, arg):
         """
         Updates an instance based on user input
         Usage:  update <class name> <id> <attribute name> "<attribute value>"
+                update <class name> <id> <dictionary>
         """
-        pattern = re.compile(r'\{.*?\}')
-        dict_match = pattern.search(arg)
-
-        if dict_match:
-            new_pattern = re.compile(r'(\w+)\s+(\S+).*')
-            new_match = new_pattern.search(arg)
-            if new_match:
-                base_args = [new_match.group(1), new_match.group(2)]
-
-            str_dict = ast.literal_eval(dict_match.group())
-            for key, value in str_dict.items():
-                updated_args = base_args.copy()
-                updated_args.append(key)
-                updated_args.append(str(value))
-                if updated_args[3] and ' ' in updated_args[3]:
-                    updated_args[3] = updated_args[3].replace(' ', '_')
-                updated_arg = ', '.join(updated_args)
-                self.do_update(updated_arg)
+        command = command_of('update', arg)
+        args = command.args
+        if not validate_classname(args, check_id=True):
             return
-        else:
-            args = [arg.rstrip(',') for arg in shlex.split(arg)]
-
-        if (not validate_classname(args, check_id=True)
-                or not validate_attrs(args)):
+        if command.attributes is not None:
+            attributes = command.attributes
+        elif not validate_attrs(args):
             return
-
-        if args[3] and '_' in args[3]:
-            args[3] = args[3].replace('_', ' ')
-
-        key = f"{args[0]}.{args[1]}"
-        if key in storage.all():
-            instance = storage.all()[key].to_dict()
-            if args[2] in instance.keys():
-                type_value = type(instance[args[2]])
-                instance[args[2]] = type_value(args[3])
-            else:
-                instance[args[2]] = args[3]
         else:
+            attributes = {args[2]: args[3].replace('_', ' ')}
+
+        obj = storage.get(args[0], args[1])
+        if obj is None:
             print("** no instance found **")
             return False
-
-        new_instance = current_classes[args[0]](**instance)
-        storage.new(new_instance)
-        new_instance.save()
+        if not attributes:
+            return
+        try:
+            obj.update(**attributes)
+        except ValueError as error:
+            print(f"** {error} **")
+            return
+        storage.save()
 
     def do_quit(self, arg):
         """Quit command to exit the program"""
@@ -218,6 +458,91 @@ class HBNBCommand(cmd.Cmd):
         pass
 
 
+def split_options(args, names):
+    """
+    Separates <name>=<value> options from the positional arguments
+    Args:
+        args (list): arguments of a command
+        names (tuple): option names, "limit" and "offset" take an integer
+    Returns:
+        tuple: positional arguments and dict of options, None after
+            printing the error of an invalid option
+    """
+    positional = []
+    options = {}
+    for arg in args:
+        name, equal, value = arg.partition("=")
+        if not equal or name not in names:
+            positional.append(arg)
+        elif name in ("limit", "offset") and not value.isdigit():
+            print(f"** invalid {name} **")
+            return positional, None
+        else:
+            options[name] = value
+    return positional, options
+
+
+def silence_stdout():
+    """points stdout to /dev/null once its reader is gone (e.g. `| head`),
+    so what is left in the buffer does not fail again at exit"""
+    try:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError, io.UnsupportedOperation):
+        pass
+
+
+def write_list(items):
+    """
+    writes items to stdout in the format of print(list(items)), one item
+    at a time, and nothing if there are none
+    Returns:
+        bool: True if the reader closed the pipe, which stops the writing
+    """
+    write = sys.stdout.write
+    separator = "["
+    try:
+        for item in items:
+            write(separator)
+            write(repr(item))
+            separator = ", "
+        if separator != "[":
+            write("]\n")
+    except BrokenPipeError:
+        silence_stdout()
+        return True
+    return False
+
+
+def unquote(text):
+    """returns text without the quotes around it, if any"""
+    if len(text) > 1 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def query_value(cls, attribute, text):
+    """
+    returns the value of a query predicate: converted to the type of the
+    class-level default of attribute when it is str, int or float, else
+    a number if text is one, else the unquoted text
+    Raises:
+        ValueError: if text cannot be converted
+    """
+    value = unquote(text)
+    kind = type(getattr(cls, attribute, None))
+    if kind is str:
+        return value
+    if value is text:
+        for number in (int, float):
+            try:
+                return number(value)
+            except ValueError:
+                pass
+    if kind in (int, float):
+        return kind(value)
+    return value
+
+
 def validate_classname(args, check_id=False):
     """Runs checks on args to validate classname entry.
     """
@@ -245,4 +570,11 @@ def validate_attrs(args):
 
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ["--batch"]:
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], encoding="UTF-8") as script:
+                errors = HBNBCommand().run_batch(script)
+        else:
+            errors = HBNBCommand().run_batch(sys.stdin)
+        sys.exit(1 if errors else 0)
     HBNBCommand().cmdloop()
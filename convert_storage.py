@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Rewrites a storage file in another format, picked from the extension.
+Usage:
+    ./convert_storage.py file.json file.bin
+    ./convert_storage.py file.json file.jsonl
+The models package is not imported: importing it would reload the
+storage file of the current directory.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _packages():
+    """registers the models and models.engine packages without running
+    models/__init__.py"""
+    for name in ("models", "models.engine"):
+        if name not in sys.modules:
+            package = types.ModuleType(name)
+            package.__path__ = [os.path.join(ROOT, *name.split("."))]
+            sys.modules[name] = package
+
+
+def format_of(path):
+    """guesses the format name of a path from its extension"""
+    if path.endswith(".json"):
+        return "json"
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    return "binary"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} <source> <destination>")
+        sys.exit(1)
+    _packages()
+    from models.engine.formats import convert
+    convert(sys.argv[1], format_of(sys.argv[1]),
+            sys.argv[2], format_of(sys.argv[2]))
@@ -3,7 +3,29 @@
 __init__ magic method for models directory
 unique FileStorage instance for your application
 """
+from os import getenv
 from models.engine.file_storage import FileStorage
 
 storage = FileStorage()
-storage.reload()
+if getenv("HBNB_STORAGE_FORMAT"):
+    storage.set_format(getenv("HBNB_STORAGE_FORMAT"),
+                       getenv("HBNB_STORAGE_PATH"))
+if getenv("HBNB_STORAGE_SHARDS"):
+    storage.enable_shards(getenv("HBNB_STORAGE_SHARDS"),
+                          int(getenv("HBNB_STORAGE_SHARD_BUCKETS", 0)))
+if getenv("HBNB_STORAGE_GENERATIONS"):
+    storage.keep_generations(int(getenv("HBNB_STORAGE_GENERATIONS")))
+if getenv("HBNB_COMPACT_MODELS"):
+    storage.use_compact_classes()
+if getenv("HBNB_FILE_JOURNAL"):
+    storage.enable_journal()
+if getenv("HBNB_AUTOFLUSH_COUNT") or getenv("HBNB_AUTOFLUSH_SECONDS"):
+    storage.set_autoflush(int(getenv("HBNB_AUTOFLUSH_COUNT", 0)) or None,
+                          float(getenv("HBNB_AUTOFLUSH_SECONDS", 0)) or None)
+if getenv("HBNB_SHARED_FILE"):
+    storage.enable_sharing()
+if getenv("HBNB_BACKGROUND_FLUSH"):
+    storage.start_flusher()
+# reload(workers=...) is not used here: its worker processes would wait
+# for this import to finish
+storage.reload(lazy=bool(getenv("HBNB_LAZY_RELOAD")))
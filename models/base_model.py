@@ -4,47 +4,159 @@ from datetime import datetime
 from uuid import uuid4
 import models
 
+DATE_KEYS = ("created_at", "updated_at")
+NON_ATTRIBUTES = ("id", "created_at", "updated_at", "__class__")
+
+
+class IsoDatetime:
+    """created_at/updated_at attribute that may hold the ISO 8601 string
+    read from storage, parsed into a datetime on first read; __dict__
+    keeps the string until then, and a string that is not a valid date
+    raises ValueError on that read"""
+
+    def __set_name__(self, owner, name):
+        """remembers the attribute name"""
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        """returns the datetime, parsing the stored string once
+        Raises:
+            ValueError: if the stored string is not a valid date
+        """
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if type(value) is str:
+            value = datetime.fromisoformat(value)
+            instance.__dict__[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        """stores a datetime or an ISO 8601 string"""
+        instance.__dict__[self.name] = value
+
 
 class BaseModel:
     """defines all common attributes/methods for other classes"""
+
+    created_at = IsoDatetime()
+    updated_at = IsoDatetime()
+
     def __init__(self, *args, **kwargs):
         """
         Initialize a class
         Args:
-            *args: variable number of positional args in a 
-            
-            ple
+            *args: variable number of positional args in a tuple
             **kwargs (dict): Key/value pairs
         """
-        self.id = str(uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-
         if kwargs:
+            # id and dates first, as for a new instance, but a uuid is
+            # only drawn and the clock only read for the ones not given
+            self.id = kwargs["id"] if "id" in kwargs else str(uuid4())
+            for key in DATE_KEYS:
+                if key not in kwargs:
+                    setattr(self, key, datetime.now())
+                elif isinstance(kwargs[key], datetime):
+                    setattr(self, key, kwargs[key])
+                else:
+                    setattr(self, key, self._read_date(kwargs[key]))
             for key, value in kwargs.items():
-                if key in ["created_at", "updated_at"]:
-                    setattr(self, key, datetime.fromisoformat(value))
-                elif key not in ["__class__"]:
+                if key not in NON_ATTRIBUTES:
                     setattr(self, key, value)
         else:
+            self.id = str(uuid4())
+            self.created_at = datetime.now()
+            self.updated_at = datetime.now()
             models.storage.new(self)
 
+    @staticmethod
+    def _read_date(value):
+        """
+        returns how an ISO 8601 string given for created_at/updated_at is
+        stored: the string itself if it is spelled the way isoformat()
+        writes it, so it is only parsed (and checked) on first read and
+        to_dict() returns it without formatting, else the parsed datetime
+        Raises:
+            ValueError: if value is spelled differently and is not an
+                ISO 8601 datetime
+        """
+        size = len(value)
+        if ((size == 19 or size == 26 and value[19] == "."
+             and value[20:] != "000000")
+                and value[4] == value[7] == "-" and value[10] == "T"
+                and value[13] == value[16] == ":"):
+            return value
+        return datetime.fromisoformat(value)
+
+    def __setattr__(self, name, value):
+        """sets an attribute and marks the instance dirty in storage"""
+        self._assign(name, value)
+        # getattr rather than __dict__, which would force every instance
+        # to allocate its attribute dict
+        if getattr(self, "id", None) is not None:
+            models.storage.touch(self)
+
+    # sets an attribute without marking the instance dirty
+    _assign = object.__setattr__
+
+    def update(self, **fields):
+        """
+        Sets several attributes in place, then updated_at, and marks the
+        instance dirty in storage once; saving is left to the caller
+        Values are converted to the type (str, int or float) of the
+        current value or of the class-level default, e.g. "3" for
+        Place.number_rooms gives 3; id, created_at, updated_at and
+        __class__ are ignored
+        Raises:
+            ValueError: if a value cannot be converted, before any
+                attribute is set
+        """
+        values = {}
+        for name, value in fields.items():
+            if name in NON_ATTRIBUTES:
+                continue
+            kind = type(getattr(self, name, None))
+            if kind in (str, int, float) and type(value) is not kind:
+                try:
+                    value = kind(value)
+                except (TypeError, ValueError):
+                    raise ValueError(
+                        f"invalid value for {name}: {value!r}") from None
+            values[name] = value
+        for name, value in values.items():
+            self._assign(name, value)
+        self._assign("updated_at", datetime.now())
+        models.storage.touch(self)
+
     def save(self):
         """updates public instance updated_at with the current datetime"""
         self.updated_at = datetime.now()
+        models.storage.new(self)
         models.storage.save()
 
     def __str__(self):
         """should print/str representation of the BaseModel instance."""
+        for key in DATE_KEYS:
+            getattr(self, key, None)
         return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
 
-    def to_dict(self):
+    def to_dict(self, native_dates=False):
         """returns a dictionary representation of the BaseModel instance
-          using a shallow copy method"""
+          using a shallow copy method
+          datetimes are ISO strings unless native_dates is True"""
         obj_dict = self.__dict__.copy()
-        for key, value in obj_dict.items():
-            if isinstance(value, datetime):
-                obj_dict[key] = value.isoformat()
+        if native_dates:
+            for key in DATE_KEYS:
+                if type(obj_dict.get(key)) is str:
+                    obj_dict[key] = getattr(self, key)
+        else:
+            # dates still held as read are already ISO strings
+            for key, value in obj_dict.items():
+                if isinstance(value, datetime):
+                    obj_dict[key] = value.isoformat()
         obj_dict["__class__"] = self.__class__.__name__
         # my_dict['updated_at'] = self.updated_at.isoformat()
         # my_dict['created_at'] = self.created_at.isoformat()
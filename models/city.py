@@ -9,3 +9,4 @@ class City(BaseModel):
 
     state_id = ""
     name = ""
+    indexed_attributes = ("state_id",)
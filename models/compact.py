@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Compact __slots__ layout for the model classes
+
+compact(Place) returns a subclass of Place that keeps id, created_at,
+updated_at and the class-level declared fields in slots. Ad-hoc
+attributes (e.g. set by do_update) go to the overflow __dict__, which is
+only allocated when one is set.
+to_dict() and __str__ give the same output as the regular class,
+including key order: each instance points to a tuple with its attribute
+names in assignment order, shared by every instance with the same order.
+BaseModel has no __slots__, so the instances still carry the inherited
+__dict__ and __weakref__ pointers: the memory saved is the attribute dict
+and the date strings, parsed as they are set.
+"""
+from datetime import datetime
+from models.base_model import BaseModel, IsoDatetime
+
+NON_FIELDS = ("indexed_attributes", "columnar_attributes",
+              "spatial_attributes")
+_compact_classes = {}
+
+
+class CompactModel:
+    """Mixin of the classes built by compact()"""
+
+    __slots__ = ()
+
+    # the slots take precedence over the IsoDatetime attributes of
+    # BaseModel, so the dates are parsed as they are set
+    _read_date = staticmethod(datetime.fromisoformat)
+
+    def __getattr__(self, name):
+        """returns the class-level default of a declared field that was
+        never assigned on this instance"""
+        try:
+            return type(self)._defaults[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute "
+                f"'{name}'") from None
+
+    def _assign(self, name, value):
+        """sets an attribute without marking the instance dirty and
+        records its name in assignment order"""
+        order = self._order
+        object.__setattr__(self, name, value)
+        if name not in order:
+            order += (name,)
+            object.__setattr__(self, "_order",
+                               type(self)._orders.setdefault(order, order))
+
+    def __delattr__(self, name):
+        """deletes an attribute and forgets its name"""
+        super().__delattr__(name)
+        order = tuple(field for field in self._order if field != name)
+        object.__setattr__(self, "_order",
+                           type(self)._orders.setdefault(order, order))
+
+    def attributes(self):
+        """returns the attributes set on the instance, like __dict__ of
+        the regular class"""
+        return {name: getattr(self, name) for name in self._order}
+
+    def __str__(self):
+        """should print/str representation of the instance."""
+        return f"[{self.__class__.__name__}] ({self.id}) {self.attributes()}"
+
+    def to_dict(self, native_dates=False):
+        """returns a dictionary representation of the instance
+          datetimes are ISO strings unless native_dates is True"""
+        obj_dict = self.attributes()
+        if not native_dates:
+            for key, value in obj_dict.items():
+                if isinstance(value, datetime):
+                    obj_dict[key] = value.isoformat()
+        obj_dict["__class__"] = self.__class__.__name__
+        return obj_dict
+
+
+def declared_fields(cls):
+    """returns the class-level fields of a model class and its bases"""
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        if not issubclass(klass, BaseModel):
+            continue
+        for name, value in vars(klass).items():
+            if (not name.startswith("_") and name not in NON_FIELDS
+                    and not callable(value)
+                    and not isinstance(value, (property, staticmethod,
+                                               classmethod, IsoDatetime))):
+                fields[name] = value
+    return fields
+
+
+def compact(cls):
+    """
+    returns the compact variant of a model class, built once per class
+    Args:
+        cls (type): BaseModel or one of its subclasses
+    """
+    if cls not in _compact_classes:
+        defaults = declared_fields(cls)
+        slots = ["id", "created_at", "updated_at"]
+        slots += [name for name in defaults if name not in slots]
+        defaults["_order"] = ()
+        namespace = {
+            "__slots__": tuple(slots) + ("_order",),
+            "__module__": cls.__module__,
+            "__doc__": f"Compact layout of {cls.__name__}",
+            "_defaults": defaults,
+            "_orders": {},
+        }
+        _compact_classes[cls] = type(cls.__name__, (CompactModel, cls),
+                                     namespace)
+    return _compact_classes[cls]
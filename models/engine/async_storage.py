@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Module for AsyncStorage class."""
+
+import asyncio
+from functools import partial
+
+
+class AsyncStorage:
+    """asyncio facade over a FileStorage
+    Saves and reloads run on an executor thread, so the event loop is not
+    blocked by JSON encoding and file I/O; FileStorage is thread safe, the
+    sync API used by console.py keeps working alongside.
+
+    Usage:
+        from models import storage
+        astorage = AsyncStorage(storage)
+        await astorage.asave()
+        place = await astorage.aget(Place, place_id)
+    """
+
+    def __init__(self, storage, executor=None):
+        """
+        Initialize the facade
+        Args:
+            storage (FileStorage): storage to wrap
+            executor (concurrent.futures.Executor): runs the blocking
+                calls, the loop's default thread pool if None
+        """
+        self.storage = storage
+        self.executor = executor
+
+    async def __run(self, function, *args, **kwargs):
+        """runs function on the executor and returns its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(function, *args, **kwargs))
+
+    async def asave(self):
+        """saves like FileStorage.save() without blocking the loop"""
+        await self.__run(self.storage.save)
+
+    async def aflush(self):
+        """writes every pending save like FileStorage.flush()"""
+        await self.__run(self.storage.flush)
+
+    async def areload(self, lazy=False):
+        """reloads like FileStorage.reload() without blocking the loop"""
+        await self.__run(self.storage.reload, lazy=lazy)
+
+    async def aget(self, cls, id):
+        """
+        returns the object of class cls with the given id, or None
+        Answered on the loop when it is a dict lookup, on the executor
+        when a lazy reload still has to read its shard or build it
+        Args:
+            cls (type or str): model class or class name
+            id (str): id of the instance
+        """
+        if self.storage.is_loaded(cls, id):
+            return self.storage.get(cls, id)
+        return await self.__run(self.storage.get, cls, id)
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""Module for crash-safe replacement of storage files."""
+
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, binary=False, generations=0):
+    """
+    Yields a temporary file next to path that replaces path once the
+    block exits without error, so path is never left half written
+    The data is fsynced before the rename and the directory after it
+
+    Args:
+        path (str): file to replace
+        binary (bool): open the temporary file in binary mode
+        generations (int): number of previous versions to keep as
+            path.1 (newest) to path.<generations> (oldest)
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    if binary:
+        file = open(tmp_path, "wb")
+    else:
+        file = open(tmp_path, "w", encoding="UTF-8")
+    try:
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if generations and os.path.exists(path):
+        rotate(path, generations)
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def rotate(path, generations):
+    """shifts path.1 .. path.<generations - 1> up by one and moves path
+    to path.1, dropping the oldest generation"""
+    names = generation_paths(path, generations)
+    for older, newer in zip(reversed(names[1:]), reversed(names[:-1])):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+
+
+def generation_paths(path, generations):
+    """returns [path, path.1, ..., path.<generations>]"""
+    return [path] + [f"{path}.{n}" for n in range(1, generations + 1)]
+
+
+def _fsync_dir(path):
+    """flushes the directory entry of path where the OS supports it"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""Module for Columns class."""
+
+import operator
+from array import array
+from math import nan
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def _differs(column_value, value):
+    """!= that does not hold for a NaN column value, on floats and on
+    NumPy arrays alike"""
+    return (column_value == column_value) & (column_value != value)
+
+
+# the comparisons of select(): a NaN row matches none of them
+COLUMN_OPERATORS = dict(OPERATORS, **{"!=": _differs})
+
+
+class Columns:
+    """Array-backed copy of numeric attributes of one model class, one row
+    per stored object, so predicates run over contiguous float64 arrays
+    instead of Python objects
+    Predicates are evaluated with NumPy when it is installed (on views of
+    the arrays, no copy) and batch by batch in pure Python otherwise,
+    which gives the same rows but is slower than a loop over the objects.
+    Values that are not numbers are stored as NaN and match nothing."""
+
+    def __init__(self, class_name, attributes, batch_size=1 << 16):
+        """
+        Initialize empty columns
+        Args:
+            class_name (str): name of the model class
+            attributes (tuple): names of the numeric attributes
+            batch_size (int): rows per batch without NumPy
+        """
+        self.class_name = class_name
+        self.attributes = tuple(attributes)
+        self.batch_size = batch_size
+        self.__arrays = {name: array("d") for name in self.attributes}
+        self.__rows = {}
+        self.__keys = []
+        self.__free = []
+
+    def __len__(self):
+        """returns the number of stored rows"""
+        return len(self.__rows)
+
+    def set(self, key, values):
+        """
+        stores the values of key, adding a row if needed
+        Args:
+            key (str): Class.id key
+            values (iterable): one value per attribute, in order
+        """
+        row = self.__rows.get(key)
+        if row is None:
+            if self.__free:
+                row = self.__free.pop()
+                self.__keys[row] = key
+            else:
+                row = len(self.__keys)
+                self.__keys.append(key)
+                for column in self.__arrays.values():
+                    column.append(nan)
+            self.__rows[key] = row
+        for name, value in zip(self.attributes, values):
+            self.__arrays[name][row] = _number(value)
+
+    def get(self, key):
+        """returns the stored values of key as a dict"""
+        row = self.__rows[key]
+        return {name: column[row] for name, column in self.__arrays.items()}
+
+    def remove(self, key):
+        """frees the row of key for reuse"""
+        row = self.__rows.pop(key, None)
+        if row is not None:
+            self.__keys[row] = None
+            self.__free.append(row)
+            for column in self.__arrays.values():
+                column[row] = nan
+
+    def select(self, predicates):
+        """
+        returns the keys whose values match every predicate
+        Args:
+            predicates (iterable): (attribute, operator, value) tuples,
+                operator being one of < <= > >= == !=
+        Raises:
+            ValueError: for an unknown attribute or operator
+        """
+        checks = []
+        for attribute, op, value in predicates:
+            if attribute not in self.__arrays:
+                raise ValueError(f"{self.class_name}.{attribute} "
+                                 "is not a columnar attribute")
+            if op not in COLUMN_OPERATORS:
+                raise ValueError(f"unknown operator: {op}")
+            checks.append((self.__arrays[attribute], COLUMN_OPERATORS[op],
+                           _number(value)))
+        if numpy is not None:
+            rows = self.__select_numpy(checks)
+        else:
+            rows = self.__select_batches(checks)
+        keys = self.__keys
+        return [keys[row] for row in rows if keys[row] is not None]
+
+    def __select_numpy(self, checks):
+        """returns the matching rows using NumPy views of the arrays"""
+        size = len(self.__keys)
+        if not size:
+            return []
+        mask = numpy.ones(size, dtype=bool)
+        for column, compare, value in checks:
+            mask &= compare(numpy.frombuffer(column, dtype=numpy.float64),
+                            value)
+        return numpy.flatnonzero(mask).tolist()
+
+    def __select_batches(self, checks):
+        """returns the matching rows one batch of rows at a time"""
+        size = len(self.__keys)
+        rows = []
+        for start in range(0, size, self.batch_size):
+            end = min(start + self.batch_size, size)
+            batch = range(start, end)
+            for column, compare, value in checks:
+                batch = [row for row in batch if compare(column[row], value)]
+                if not batch:
+                    break
+            rows.extend(batch)
+        return rows
+
+
+def _number(value):
+    """returns value as a float, NaN if it is not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Module for FileLock class."""
+
+import os
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileLock:
+    """Advisory lock shared by the processes using one storage file
+    The lock is taken on path.lock, since the storage file itself is
+    replaced by every save. The lock file also holds a generation counter
+    that every write bumps, so readers can tell that the file changed even
+    when its size and mtime did not.
+    Where fcntl is not available (Windows) locking is a no-op."""
+
+    def __init__(self, path):
+        """
+        Initialize the lock of a storage file
+        Args:
+            path (str): path of the storage file
+        """
+        self.path = path + ".lock"
+
+    @contextmanager
+    def shared(self):
+        """holds the lock shared with other readers"""
+        with self.__locked(fcntl.LOCK_SH if fcntl else None) as file:
+            yield file
+
+    @contextmanager
+    def exclusive(self):
+        """holds the lock for a single writer"""
+        with self.__locked(fcntl.LOCK_EX if fcntl else None) as file:
+            yield file
+
+    @contextmanager
+    def __locked(self, operation):
+        """opens the lock file and holds operation on it"""
+        with open(self.path, "a+", encoding="UTF-8") as file:
+            if fcntl:
+                fcntl.flock(file.fileno(), operation)
+            try:
+                yield file
+            finally:
+                if fcntl:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def generation(file):
+        """returns the generation counter stored in an open lock file"""
+        file.seek(0)
+        try:
+            return int(file.read() or 0)
+        except ValueError:
+            return 0
+
+    def bump(self, file):
+        """increments the generation counter of an exclusively locked
+        file and returns the new value"""
+        generation = self.generation(file) + 1
+        file.seek(0)
+        file.truncate()
+        file.write(str(generation))
+        file.flush()
+        return generation
+
+
+def stamp(path, generation):
+    """returns what identifies one version of the file at path: the
+    generation counter, inode, mtime and size, None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (generation, stat.st_ino, stat.st_mtime_ns, stat.st_size)
@@ -1,15 +1,40 @@
 #!/usr/bin/python3
 """Module for FileStorage class."""
 
-import json
+import atexit
 import os
-from models.base_model import BaseModel
-# from models.user import User
-# from models.state import State
-# from models.city import City
-# from models.amenity import Amenity
-# from models.place import Place
-# from models.review import Review
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice, repeat
+from time import monotonic, perf_counter
+from models.base_model import DATE_KEYS, BaseModel
+from models.compact import compact
+from models.engine.atomic_file import atomic_open, generation_paths
+from models.engine import columns as columns_module
+from models.engine.columns import Columns
+from models.engine.file_lock import FileLock, stamp
+from models.engine.flusher import BackgroundFlusher
+from models.engine.formats import (JSONFormat, JSONLinesFormat, get_format,
+                                   open_file)
+from models.engine.index import AttributeIndex, ClassIndex
+from models.engine.journal import Journal
+from models.engine.lazy_objects import LazyObjects
+from models.engine.query import compile_predicates, matches, ordered
+from models.engine.shards import ShardLayout, read_shard
+from models.engine.snapshot import LazySnapshot, Snapshot
+from models.engine.spatial import GeoGrid
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+# not every Python has reference counts, all() then copies after each write
+_getrefcount = getattr(sys, "getrefcount", None)
 
 
 class FileStorage:
@@ -20,18 +45,481 @@ class FileStorage:
     __objects = {}
     __current_classes = {
         'BaseModel': BaseModel,
-    #     'User': User,
-    #     'State': State,
-    #     'City': City,
-    #     'Amenity': Amenity,
-    #     'Place': Place,
-    #     'Review': Review
+        'User': User,
+        'State': State,
+        'City': City,
+        'Amenity': Amenity,
+        'Place': Place,
+        'Review': Review
     }
+    __builders = __current_classes
+    __format = JSONFormat()
+    __generations = 0
+    __transactions = None
+    __pending_saves = 0
+    __autoflush = (None, None)
+    __last_flush = 0.0
+    __flush_latency = None
+    __flusher = None
+    __timer = None
+    __journal = None
+    __lock = None
+    __stamp = None
+    __synced = set()
+    __dirty = set()
+    __cache = {}
+    __class_index = ClassIndex()
+    __attribute_indexes = {}
+    __columns = {}
+    __spatial = {}
+    __indexed = None
+    __writer = threading.RLock()
+    __flushing = threading.Lock()
+    __snapshot = None
+    __shards = None
+    __unloaded = frozenset()
+    __lazy_shards = False
+
+    def all(self, cls=None):
+        """
+        return all objects stored in the file
+        The dict is a read-only snapshot (changing it raises TypeError)
+        shared by every reader, so it can be iterated while other threads
+        change the storage. new() and delete() update it in place while
+        no reader holds it, else the next all() takes a new copy.
+
+        Args:
+            cls (type or str): only return the objects of this class,
+                looked up through the class index
+        """
+        name = None if cls is None else self.__class_name(cls)
+        self.__require(name)
+        snapshot = self.__current_snapshot()
+        if name is None:
+            return snapshot[1]
+        if name not in snapshot[2]:
+            with self.__writer:
+                if name not in snapshot[2]:
+                    copy = snapshot[1]
+                    entries = ((key, dict.get(copy, key))
+                               for key in self.__index().keys(name)
+                               if key in copy)
+                    # a lazy view leaves the records it holds unbuilt
+                    if isinstance(copy, LazySnapshot):
+                        view = LazySnapshot(copy.classes, entries,
+                                            source=copy)
+                    else:
+                        view = Snapshot(entries)
+                    snapshot[2][name] = view
+        return snapshot[2][name]
 
-    def all(self):
-        """return all objects stored in the file"""
-        return self.__objects
-        # return FileStorage.__objects
+    def __current_snapshot(self):
+        """returns the (objects, copy, class views) snapshot of the
+        current objects, taken if the last one is stale"""
+        snapshot = self.__snapshot
+        if not self.__is_current(snapshot):
+            with self.__writer:
+                snapshot = self.__snapshot
+                if not self.__is_current(snapshot):
+                    objects = self.__objects
+                    if isinstance(objects, LazyObjects):
+                        copy = LazySnapshot(objects.classes,
+                                            dict.items(objects),
+                                            source=objects)
+                    else:
+                        copy = Snapshot(objects)
+                    snapshot = self.__snapshot = (objects, copy, {})
+        return snapshot
+
+    def __patch_snapshot(self, key, value=None):
+        """makes the snapshot of all() follow a write of key, value None
+        for a delete: changed in place if no reader holds it or the view
+        of its class, else dropped; run under the writer lock"""
+        snapshot = self.__snapshot
+        if snapshot is None:
+            return
+        _, copy, views = snapshot
+        view = views.get(key.partition(".")[0])
+        # held by the snapshot, a local variable and getrefcount() itself
+        if (_getrefcount is None or _getrefcount(copy) > 3
+                or view is not None and _getrefcount(view) > 3):
+            self.__snapshot = None
+            return
+        for mapping in (copy, view):
+            if mapping is None:
+                continue
+            if value is None:
+                dict.pop(mapping, key, None)
+            else:
+                dict.__setitem__(mapping, key, value)
+
+    def scan(self, cls=None, after=None):
+        """
+        returns an iterator over the stored objects, or those of a class,
+        in insertion order, building lazily reloaded instances only as
+        the iterator reaches them
+        With a class the objects are read a batch at a time while the
+        iterator advances: objects added since the call are left out and
+        destroyed ones skipped. Without one it reads the all() snapshot.
+        Args:
+            cls (type or str): only the objects of this class
+            after (str): Class.id key to start after, e.g. the last
+                object of the previous page; with a class the scan starts
+                there directly, without it the keys before are walked
+        Raises:
+            KeyError: if after is not a stored key
+        """
+        name = None if cls is None else self.__class_name(cls)
+        self.__require(name)
+        if name is not None:
+            with self.__writer:
+                if (after is not None and (after.partition(".")[0] != name
+                                           or after not in self.__objects)):
+                    raise KeyError(after)
+                keys = self.__index().keys_after(name, after)
+            return self.__matching(keys, ())
+        objects = self.__current_snapshot()[1]
+        if after is not None and after not in objects:
+            raise KeyError(after)
+        keys = iter(objects)
+        if after is not None:
+            for key in keys:
+                if key == after:
+                    break
+        return (objects[key] for key in keys if key in objects)
+
+    def __is_current(self, snapshot):
+        """returns True if snapshot is a copy of the current objects"""
+        return (snapshot is not None and snapshot[0] is self.__objects
+                and len(snapshot[1]) == len(self.__objects))
+
+    def count(self, cls=None):
+        """
+        returns the number of objects stored
+        Args:
+            cls (type or str): only count the objects of this class
+        """
+        name = None if cls is None else self.__class_name(cls)
+        self.__require(name)
+        if name is None:
+            return len(self.__objects)
+        return self.__index().count(name)
+
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name of a model class or class name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def lookup(self, cls, **attributes):
+        """
+        returns the objects of class cls whose attributes equal the given
+        values, e.g. lookup(City, state_id=state.id)
+        Attributes listed in the model's indexed_attributes are answered
+        from their index, the others by checking the remaining candidates
+
+        Args:
+            cls (type or str): model class or class name
+            **attributes: attribute names and the values to match
+        """
+        name = self.__class_name(cls)
+        self.__require(name)
+        with self.__writer:
+            class_index = self.__index()
+            indexes = {index.attribute: index for index
+                       in self.__attribute_indexes.get(name, ())}
+            matches = []
+            rest = {}
+            for attribute, value in attributes.items():
+                if attribute in indexes:
+                    matches.append(indexes[attribute].keys(value))
+                else:
+                    rest[attribute] = value
+            if matches:
+                matches.sort(key=len)
+                candidates = matches.pop(0)
+            else:
+                candidates = class_index.keys(name)
+
+            objects = self.__objects
+            result = {}
+            for key in candidates:
+                if (key not in objects
+                        or any(key not in keys for keys in matches)):
+                    continue
+                value = dict.get(objects, key)
+                if all(self.__attribute(value, attribute) == expected
+                       for attribute, expected in rest.items()):
+                    result[key] = objects[key]
+            return result
+
+    def select(self, cls, *predicates):
+        """
+        returns the objects of class cls matching every predicate,
+        evaluated in vectorized batches over the columnar copy of the
+        model's columnar_attributes, e.g.
+        select(Place, ("price_by_night", "<", 100), ("max_guest", ">=", 4))
+
+        Args:
+            cls (type or str): model class or class name
+            *predicates: (attribute, operator, value) tuples, operator
+                being one of < <= > >= == !=
+        Raises:
+            ValueError: if cls has no columns or for an unknown attribute
+                or operator
+        """
+        name = self.__class_name(cls)
+        self.__require(name)
+        with self.__writer:
+            self.__index()
+            if name not in self.__columns:
+                raise ValueError(f"{name} has no columnar attributes")
+            objects = self.__objects
+            return {key: objects[key]
+                    for key in self.__columns[name].select(predicates)}
+
+    def query(self, cls, *predicates, fields=None, order=None, limit=None,
+              offset=0):
+        """
+        returns an iterator over the objects of class cls matching every
+        predicate, e.g. the 10 cheapest places of a city under 80:
+        query(Place, ("city_id", "==", city.id),
+              ("price_by_night", "<", 80),
+              order=["price_by_night"], limit=10)
+        The planner (see explain()) takes the candidates from an attribute
+        index for == on an indexed attribute, else, when NumPy is
+        installed, from the columns for numeric comparisons other than !=
+        on columnar attributes, else from a lazy scan
+        of the class; every predicate is then checked on the stored value,
+        read a batch at a time as the iterator advances, so lazily
+        reloaded records are only built when they match.
+        Without order the results stream in candidate order and the
+        candidates stop being read once limit is reached.
+
+        Args:
+            cls (type or str): model class or class name
+            *predicates: (attribute, operator, value) tuples, operator
+                being one of < <= > >= == !=
+            fields (list): attribute names to project each object to,
+                the iterator then yields dicts
+            order (list): attribute names to sort by, descending for
+                names prefixed with -
+            limit (int): maximum number of results
+            offset (int): number of results to skip
+        Raises:
+            ValueError: for an unknown operator, or for order on values
+                that cannot be compared
+        """
+        name = self.__class_name(cls)
+        checks = compile_predicates(predicates)
+        self.__require(name)
+        _, keys = self.__plan(name, predicates)
+        results = self.__matching(keys, checks)
+        stop = None if limit is None else offset + limit
+        if order:
+            results = ordered(results, order, stop)
+        results = islice(results, offset, stop)
+        if fields is None:
+            return results
+        return ({field: getattr(obj, field, None) for field in fields}
+                for obj in results)
+
+    def explain(self, cls, *predicates):
+        """
+        returns how query() would find the candidates of predicates:
+        "index <attribute>", "columns <attributes>" or "scan"
+        Args:
+            cls (type or str): model class or class name
+            *predicates: (attribute, operator, value) tuples
+        """
+        name = self.__class_name(cls)
+        self.__require(name)
+        return self.__plan(name, predicates)[0]
+
+    def __plan(self, name, predicates):
+        """returns the plan of predicates on class name and the list of
+        its candidate keys"""
+        with self.__writer:
+            class_index = self.__index()
+            indexes = {index.attribute: index for index
+                       in self.__attribute_indexes.get(name, ())}
+            candidates = [(len(indexes[attribute].keys(value)), attribute,
+                           value)
+                          for attribute, op, value in predicates
+                          if op == "==" and attribute in indexes]
+            if candidates:
+                _, attribute, value = min(candidates, key=lambda c: c[0])
+                return (f"index {attribute}",
+                        list(indexes[attribute].keys(value)))
+            # without NumPy the columns are slower than the scan; != is
+            # left to the checks, as rows that are not numbers never match
+            # it in the columns
+            columns = self.__columns.get(name)
+            if columns_module.numpy is None:
+                columns = None
+            numeric = [predicate for predicate in predicates
+                       if columns is not None
+                       and predicate[0] in columns.attributes
+                       and predicate[1] != "!="
+                       and type(predicate[2]) in (int, float)]
+            if numeric:
+                attributes = ", ".join(dict.fromkeys(
+                    attribute for attribute, _, _ in numeric))
+                return f"columns {attributes}", columns.select(numeric)
+            return "scan", class_index.keys_after(name)
+
+    def __matching(self, keys, checks):
+        """yields the stored objects of keys that pass checks, reading
+        the objects under the writer lock a batch of keys at a time and
+        building lazily reloaded ones only if they pass"""
+        objects = self.__objects
+        attribute = self.__attribute
+        keys = iter(keys)
+        while True:
+            with self.__writer:
+                batch = [(key, dict.get(objects, key))
+                         for key in islice(keys, 256)]
+            if not batch:
+                return
+            for key, value in batch:
+                if value is None or not matches(value, checks, attribute):
+                    continue
+                if type(value) is dict:
+                    value = objects.get(key)
+                    if value is None:
+                        continue
+                yield value
+
+    def near(self, cls, latitude, longitude, radius):
+        """
+        returns the objects of class cls at most radius kilometers away
+        from a point, nearest first, e.g. near(Place, 48.85, 2.35, 5)
+        Only the grid cells around the point are searched
+
+        Args:
+            cls (type or str): model class or class name
+            latitude (float): latitude of the point
+            longitude (float): longitude of the point
+            radius (float): radius in kilometers
+        Raises:
+            ValueError: if cls has no spatial_attributes
+        """
+        with self.__writer:
+            hits = self.__grid(cls).near(latitude, longitude, radius)
+            objects = self.__objects
+            return {key: objects[key] for _, key in hits}
+
+    def nearest(self, cls, latitude, longitude, count=1):
+        """
+        returns the count objects of class cls nearest to a point,
+        nearest first
+        Args:
+            cls (type or str): model class or class name
+            latitude (float): latitude of the point
+            longitude (float): longitude of the point
+            count (int): number of objects
+        Raises:
+            ValueError: if cls has no spatial_attributes
+        """
+        with self.__writer:
+            hits = self.__grid(cls).nearest(latitude, longitude, count)
+            objects = self.__objects
+            return {key: objects[key] for _, key in hits}
+
+    def within(self, cls, south, west, north, east):
+        """
+        returns the objects of class cls inside a bounding box, a box
+        with west greater than east crossing the antimeridian
+        Args:
+            cls (type or str): model class or class name
+            south, west, north, east (float): edges of the box in degrees
+        Raises:
+            ValueError: if cls has no spatial_attributes
+        """
+        with self.__writer:
+            keys = self.__grid(cls).within(south, west, north, east)
+            objects = self.__objects
+            return {key: objects[key] for key in keys}
+
+    def __grid(self, cls):
+        """returns the spatial index of a class"""
+        name = self.__class_name(cls)
+        self.__require(name)
+        self.__index()
+        if name not in self.__spatial:
+            raise ValueError(f"{name} has no spatial attributes")
+        return self.__spatial[name]
+
+    def __attribute(self, value, name):
+        """returns attribute name of a stored instance or raw record"""
+        if type(value) is dict:
+            cls = self.__current_classes[value['__class__']]
+            return value.get(name, getattr(cls, name, None))
+        return getattr(value, name, None)
+
+    def __index(self):
+        """returns the class index, rebuilding it and the attribute indexes
+        when __objects was replaced or changed without going through new()
+        or delete()"""
+        index = self.__class_index
+        if (self.__indexed is not self.__objects
+                or index.size != len(self.__objects)):
+            with self.__writer:
+                return self.__rebuild_index()
+        return index
+
+    def __rebuild_index(self):
+        """rebuilds the class index, attribute indexes, columns and
+        spatial indexes from __objects, unless another thread just did"""
+        index = self.__class_index
+        if (self.__indexed is not self.__objects
+                or index.size != len(self.__objects)):
+            index = self.__class_index = ClassIndex()
+            self.__attribute_indexes = {}
+            self.__columns = {}
+            self.__spatial = {}
+            for name, cls in self.__current_classes.items():
+                attributes = getattr(cls, "indexed_attributes", ())
+                if attributes:
+                    self.__attribute_indexes[name] = [
+                        AttributeIndex(name, attribute)
+                        for attribute in attributes]
+                attributes = getattr(cls, "columnar_attributes", ())
+                if attributes:
+                    self.__columns[name] = Columns(name, attributes)
+                attributes = getattr(cls, "spatial_attributes", ())
+                if attributes:
+                    self.__spatial[name] = GeoGrid(name, attributes)
+            for key, value in dict.items(self.__objects):
+                index.add(key)
+                self.__reindex(key, value)
+            self.__indexed = self.__objects
+        return index
+
+    def __reindex(self, key, value):
+        """updates the attribute indexes, columns and spatial index of
+        key for its stored value"""
+        name = key.partition(".")[0]
+        for index in self.__attribute_indexes.get(name, ()):
+            index.add(key, self.__attribute(value, index.attribute))
+        columns = self.__columns.get(name)
+        if columns is not None:
+            columns.set(key, [self.__attribute(value, attribute)
+                              for attribute in columns.attributes])
+        grid = self.__spatial.get(name)
+        if grid is not None:
+            grid.add(key, *[self.__attribute(value, attribute)
+                            for attribute in grid.attributes])
+
+    def __unindex(self, key):
+        """removes key from the attribute indexes, columns and spatial
+        index"""
+        name = key.partition(".")[0]
+        for index in self.__attribute_indexes.get(name, ()):
+            index.remove(key)
+        if name in self.__columns:
+            self.__columns[name].remove(key)
+        if name in self.__spatial:
+            self.__spatial[name].remove(key)
 
     def new(self, obj):
         """_summary_
@@ -42,30 +530,768 @@ class FileStorage:
         """
         if obj:
             key = f"{obj.__class__.__name__}.{obj.id}"
-            self.__objects[key] = obj
+            with self.__writer:
+                index = self.__index()
+                # save() adds an object again under its own key, which
+                # leaves the snapshot of all() current
+                if dict.get(self.__objects, key) is not obj:
+                    self.__objects[key] = obj
+                    index.add(key)
+                    self.__patch_snapshot(key, obj)
+                self.__reindex(key, obj)
+                self.__dirty.add(key)
+
+    def get(self, cls, id):
+        """
+        returns the object of class cls with the given id, or None
+        Args:
+            cls (type or str): model class or class name
+            id (str): id of the instance
+        """
+        key = f"{self.__class_name(cls)}.{id}"
+        self.__require(key=key)
+        return self.__objects.get(key)
+
+    def is_loaded(self, cls, id):
+        """
+        returns True if get() of this key is a dict lookup: its shard was
+        read and the instance, if there is one, already built
+        Args:
+            cls (type or str): model class or class name
+            id (str): id of the instance
+        """
+        key = f"{self.__class_name(cls)}.{id}"
+        unloaded = self.__unloaded
+        if unloaded and self.__shards.shard_of(key) in unloaded:
+            return False
+        return type(dict.get(self.__objects, key)) is not dict
+
+    def delete(self, obj=None):
+        """removes obj from __objects if it is inside"""
+        if obj:
+            key = f"{obj.__class__.__name__}.{obj.id}"
+            self.__require(key=key)
+            with self.__writer:
+                index = self.__index()
+                if self.__objects.pop(key, None) is not None:
+                    index.remove(key)
+                    self.__unindex(key)
+                    self.__dirty.add(key)
+                    self.__patch_snapshot(key)
+
+    def touch(self, obj):
+        """
+        marks a stored object as modified since the last save
+        Containers mutated in place (e.g. amenity_ids.append) are not
+        seen by BaseModel.__setattr__ and need an explicit touch
+
+        Args:
+            obj (BaseModel): instance whose attributes changed
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if dict.get(self.__objects, key) is not obj:
+            return
+        name = obj.__class__.__name__
+        with self.__writer:
+            # under the lock, so a write swapping the dirty set out
+            # cannot miss the key
+            self.__dirty.add(key)
+            if (name in self.__attribute_indexes or name in self.__columns
+                    or name in self.__spatial):
+                self.__index()
+                self.__reindex(key, obj)
+
+    def dirty_count(self):
+        """returns the number of keys changed since the last save"""
+        return len(self.__dirty)
+
+    def enable_journal(self, threshold=1 << 20):
+        """
+        Switches save() to append one record per change to a log file
+        next to the JSON file instead of rewriting it
+
+        Args:
+            threshold (int): log size in bytes that triggers compaction
+        Raises:
+            ValueError: after enable_shards() or enable_sharing(), or
+                with another format than json since the journal compacts
+                into a JSON file
+        """
+        if self.__shards:
+            raise ValueError("the journal is not combined with shards")
+        if self.__lock:
+            raise ValueError("the journal is not shared between processes")
+        if self.__format.name != JSONFormat.name:
+            raise ValueError("the journal only keeps a json snapshot")
+        self.__journal = Journal(self.__file_path, threshold)
+
+    def set_format(self, name, file_path=None):
+        """
+        Selects the file format used by save() and reload()
+
+        Args:
+            name (str): "json" or "binary"
+            file_path (str): file to use, defaults to the format's
+                file.json or file.bin
+        Raises:
+            ValueError: for another format than json after
+                enable_journal()
+        """
+        fmt = get_format(name)
+        if self.__journal and fmt.name != JSONFormat.name:
+            raise ValueError("the journal only keeps a json snapshot")
+        self.__format = fmt
+        self.__file_path = file_path or self.__format.file_name
+        if self.__journal:
+            self.__journal = Journal(self.__file_path,
+                                     self.__journal.threshold)
+        self.__cache = {}
+        if self.__lock:
+            self.__lock = FileLock(self.__file_path)
+        if self.__shards:
+            self.enable_shards(self.__shards.directory,
+                               self.__shards.buckets)
+
+    def enable_shards(self, directory, buckets=0):
+        """
+        Splits the storage into one file per class in directory, or per
+        class and hash bucket of the id, e.g. shards/Place.3.json
+        flush() only rewrites the shards holding changed or destroyed
+        objects, and reload(lazy=True) only reads the shards of a class
+        the first time that class (or, with buckets, that id) is used
+        Not combined with the journal or enable_sharing().
+
+        Args:
+            directory (str): directory of the shard files
+            buckets (int): number of files per class, 0 for one file;
+                must not change once the directory has files
+        Raises:
+            ValueError: after enable_journal() or enable_sharing()
+        """
+        if self.__journal:
+            raise ValueError("shards are not combined with the journal")
+        if self.__lock:
+            raise ValueError("shards are not shared between processes")
+        os.makedirs(directory, exist_ok=True)
+        extension = os.path.splitext(self.__format.file_name)[1]
+        self.__shards = ShardLayout(directory, buckets, extension)
+
+    def __require(self, class_name=None, key=None):
+        """loads the shards not yet read that hold key, the objects of
+        class_name, or every object if both are None"""
+        if not self.__unloaded:
+            return
+        with self.__writer:
+            unloaded = self.__unloaded
+            if key is not None:
+                wanted = {self.__shards.shard_of(key)} & unloaded
+            elif class_name is not None:
+                wanted = {shard for shard in unloaded
+                          if ShardLayout.class_of(shard) == class_name}
+            else:
+                wanted = unloaded
+            self.__load_shards(wanted)
+
+    def __load_shards_parallel(self, workers):
+        """decodes every shard and builds its instances in a pool of
+        worker processes, then stores them as the shards come back
+        The compact classes cannot be pickled, their instances are built
+        here from the decoded records"""
+        shards = sorted(self.__unloaded)
+        if not shards:
+            return
+        paths = [self.__shards.path(shard) for shard in shards]
+        build = self.__builders is self.__current_classes
+        with ProcessPoolExecutor(min(workers, len(paths))) as pool:
+            for shard, entries in zip(shards, pool.map(
+                    read_shard, paths, repeat(self.__format.name),
+                    repeat(self.__generations),
+                    repeat(self.__builders if build else None))):
+                with self.__writer:
+                    self.__unloaded = self.__unloaded - {shard}
+                    dirty = self.__dirty
+                    entries = [(key, value) for key, value in entries
+                               if key not in dirty]
+                    if build:
+                        self.__adopt(entries)
+                    else:
+                        self.__load(entries)
+
+    def __adopt(self, entries):
+        """stores instances built elsewhere for (key, instance) pairs"""
+        self.__snapshot = None
+        index = self.__index()
+        objects = self.__objects
+        for key, obj in entries:
+            if isinstance(objects, LazyObjects):
+                dict.__setitem__(objects, key, obj)
+            else:
+                objects[key] = obj
+            index.add(key)
+            self.__reindex(key, obj)
+
+    def __load_shards(self, shards):
+        """reads the shards not yet read among shards"""
+        if not self.__unloaded:
+            return
+        with self.__writer:
+            for shard in sorted(set(shards) & self.__unloaded):
+                self.__unloaded = self.__unloaded - {shard}
+                # keys changed or destroyed before the shard was read
+                # keep their version in memory
+                dirty = self.__dirty
+                self.__load_file(self.__lazy_shards,
+                                 self.__shards.path(shard),
+                                 lambda key: key not in dirty)
+
+    def enable_sharing(self):
+        """
+        Lets several processes use the same file: flush() and reload()
+        take a lock on file.json.lock, reload() only reads the file again
+        when another process wrote it, and both merge the file key by key
+        with the objects of this process instead of overwriting them
+        The objects changed or destroyed here since the last flush win,
+        the other keys take the version in the file. The journal
+        (enable_journal) is not shared between processes.
+        Raises:
+            ValueError: after enable_shards() or enable_journal()
+        """
+        if self.__shards:
+            raise ValueError("shards are not shared between processes")
+        if self.__journal:
+            raise ValueError("the journal is not shared between processes")
+        self.__lock = FileLock(self.__file_path)
+        self.__stamp = None
+        self.__synced = set(dict.keys(self.__objects)) - self.__dirty
+
+    def refresh(self):
+        """
+        Merges the changes other processes saved since the last reload
+        or flush of this process
+        Returns:
+            bool: False if the file did not change
+        """
+        if not self.__lock:
+            self.reload()
+            return True
+        with self.__lock.shared() as lock_file:
+            return self.__merge_changes(lock_file)
+
+    def __merge_changes(self, lock_file):
+        """merges the file if its stamp changed since the last merge or
+        write, the caller holding the lock"""
+        current = stamp(self.__file_path, self.__lock.generation(lock_file))
+        if current == self.__stamp:
+            return False
+        if current is None:
+            self.__merge(())
+        else:
+            with open_file(self.__file_path, self.__format, "r") as file:
+                self.__merge(self.__format.read(file))
+        self.__stamp = current
+        return True
+
+    def __merge(self, records):
+        """applies the (key, dict) records of the file to the keys not
+        changed in this process, and drops the keys another process
+        destroyed"""
+        with self.__writer:
+            self.__snapshot = None
+            self.__merge_records(records)
+
+    def __merge_records(self, records):
+        """__merge() body, run under the writer lock"""
+        objects = self.__objects
+        index = self.__index()
+        dirty = self.__dirty
+        fmt = self.__format
+        cache = self.__cache
+        seen = set()
+        for key, val in records:
+            seen.add(key)
+            class_name = val['__class__']
+            if key in dirty or class_name not in self.__current_classes:
+                continue
+            encoded = fmt.encode(key, val)
+            # the cached encoding is the one of the current object as
+            # long as it was not changed, which would make the key dirty
+            entry = cache.get(key)
+            if (entry is not None and entry[1] == encoded
+                    and entry[0] is dict.get(objects, key)):
+                continue
+            if isinstance(objects, LazyObjects):
+                dict.__setitem__(objects, key, val)
+            else:
+                val = objects[key] = self.__builders[class_name](**val)
+            cache[key] = (val, encoded)
+            index.add(key)
+            self.__reindex(key, val)
+        for key in self.__synced - seen:
+            if key not in dirty and dict.pop(objects, key, None) is not None:
+                index.remove(key)
+                self.__unindex(key)
+        self.__synced = seen
 
     def save(self):
-        """Serializes the objects to a JSON file"""
-        serialized_obj = {}
-        for key, value in self.__objects.items():
-            serialized_obj[key] = value.to_dict()
+        """Serializes the objects to a JSON file
+        Inside transaction() or under an autoflush policy the write is
+        deferred and several saves are grouped into one flush()
+        With start_flusher() the write is left to the background thread"""
+        self.__pending_saves += 1
+        if getattr(self.__thread_state(), "depth", 0):
+            return
+        if not self.__autoflush_due():
+            self.__arm_timer()
+            return
+        self.__hand_over()
+
+    def __arm_timer(self):
+        """starts a timer that flushes the pending saves once the seconds
+        of the autoflush policy have passed since the last flush"""
+        seconds = self.__autoflush[1]
+        if not seconds or self.__timer is not None:
+            return
+        with self.__writer:
+            if self.__timer is None:
+                delay = max(0.0, self.__last_flush + seconds - monotonic())
+                timer = self.__timer = threading.Timer(delay,
+                                                       self.__timed_flush)
+                timer.daemon = True
+                timer.start()
+
+    def __timed_flush(self):
+        """flushes the pending saves when the autoflush timer expires"""
+        self.__timer = None
+        if self.__pending_saves:
+            self.__hand_over()
+
+    def __hand_over(self):
+        """flushes now, or asks the background flusher to"""
+        if self.__flusher:
+            self.__flusher.request()
+        else:
+            self.flush()
+
+    def start_flusher(self):
+        """
+        Moves the writes of save() to a background thread so callers do
+        not wait for encoding and disk I/O. The saves made while a write
+        is running are grouped into the next one.
+        flush() still writes synchronously and close() writes the
+        pending saves and stops the thread, also run at interpreter exit
+        """
+        if not self.__flusher:
+            self.__flusher = BackgroundFlusher(self.__flush_pending)
+            atexit.register(self.close)
+
+    def close(self):
+        """Writes the pending saves and stops the background flusher
+        Raises:
+            Exception: the error of a failed background write
+        """
+        flusher, self.__flusher = self.__flusher, None
+        if flusher:
+            flusher.close()
+        self.__flush_pending()
+
+    def queue_depth(self):
+        """returns the number of saves handed to the background flusher
+        and not yet picked up by a write"""
+        return self.__flusher.depth() if self.__flusher else 0
 
-        with open(self.__file_path, "w", encoding="UTF-8") as file:
-            json.dump(serialized_obj, file)
+    def last_flush_latency(self):
+        """returns how many seconds the last flush() took, None before
+        the first one"""
+        return self.__flush_latency
+
+    @contextmanager
+    def transaction(self):
+        """
+        Defers every save() made inside the block and flushes once when
+        the outermost block exits, even on error since the changes are
+        already applied in memory (there is no rollback)
+        Only the saves of the thread running the block are deferred.
+
+        Usage:
+            with storage.transaction():
+                for row in rows:
+                    Place(**row).save()
+        """
+        state = self.__thread_state()
+        state.depth = getattr(state, "depth", 0) + 1
+        try:
+            yield self
+        finally:
+            state.depth -= 1
+            if not state.depth and self.__pending_saves:
+                self.__hand_over()
+
+    def __thread_state(self):
+        """returns the per-thread state of transaction() for this
+        storage, created on first use"""
+        state = self.__transactions
+        if state is None:
+            with self.__writer:
+                if self.__transactions is None:
+                    self.__transactions = threading.local()
+                state = self.__transactions
+        return state
+
+    def set_autoflush(self, count=None, seconds=None):
+        """
+        Defers save() for long-running processes: the file is only
+        written once count saves are pending or seconds have passed since
+        the last write, whichever comes first, and at interpreter exit;
+        a timer started by the first deferred save writes it when the
+        seconds pass even if no other save comes
+
+        Args:
+            count (int): number of pending saves that triggers a flush
+            seconds (float): age of the last flush that triggers a flush
+        """
+        if (count or seconds) and self.__autoflush == (None, None):
+            atexit.register(self.__flush_pending)
+        self.__autoflush = (count, seconds)
+        self.__last_flush = monotonic()
 
-    def reload(self):
-        """Deserializes the JSON file to objects"""
-        if os.path.exists(self.__file_path):
+    def __autoflush_due(self):
+        """returns True if the autoflush policy asks for a write now"""
+        count, seconds = self.__autoflush
+        if not count and not seconds:
+            return True
+        if count and self.__pending_saves >= count:
+            return True
+        return bool(seconds) and monotonic() - self.__last_flush >= seconds
+
+    def __flush_pending(self):
+        """flushes if any save() is still waiting to be written"""
+        if self.__pending_saves:
+            self.flush()
+
+    def pending_saves(self):
+        """returns the number of save() calls not yet written"""
+        return self.__pending_saves
+
+    def flush(self):
+        """Writes the changes of every pending save() now
+        Only objects added or modified since the last flush are encoded
+        again, the others reuse their cached encoding
+        The objects are copied under the writer lock and encoded and
+        written after releasing it, so other threads can keep changing
+        the storage during the write. Flushes run one at a time."""
+        with self.__flushing:
+            start = perf_counter()
+            try:
+                self.__flush()
+            finally:
+                self.__flush_latency = perf_counter() - start
+
+    def __flush(self):
+        """flush() body, run under the flush lock"""
+        self.__pending_saves = 0
+        self.__last_flush = monotonic()
+        timer, self.__timer = self.__timer, None
+        if timer:
+            timer.cancel()
+        if self.__journal:
+            with self.__writer:
+                dirty, self.__dirty = self.__dirty, set()
+                changes = [(key, dict.get(self.__objects, key))
+                           for key in dirty]
+            try:
+                self.__journal.append(
+                    [(key, self.__record(obj) if obj else None)
+                     for key, obj in changes])
+            except Exception:
+                self.__restore_dirty(dirty)
+                raise
+            return
+        if self.__shards:
+            self.__write_shards()
+            return
+        if not self.__lock:
+            self.__write()
+            return
+        with self.__lock.exclusive() as lock_file:
+            self.__merge_changes(lock_file)
+            written = self.__write()
+            self.__stamp = stamp(self.__file_path,
+                                 self.__lock.bump(lock_file))
+            self.__synced = set(written)
+
+    def __restore_dirty(self, keys):
+        """marks keys dirty again after a failed write, so that the next
+        flush() writes them"""
+        with self.__writer:
+            self.__dirty |= keys
+
+    def __write(self):
+        """writes a copy of the objects, encoding again only the dirty
+        ones, and returns that copy"""
+        with self.__writer:
+            dirty, self.__dirty = self.__dirty, set()
+            objects = dict(dict.items(self.__objects))
+        fmt = self.__format
+        cache = self.__cache
+        try:
+            for key in dirty:
+                cache.pop(key, None)
+            parts = []
+            for key, obj in objects.items():
+                entry = cache.get(key)
+                if entry is None or entry[0] is not obj:
+                    entry = cache[key] = (obj, fmt.encode(key, obj))
+                parts.append(entry[1])
+            if len(cache) > len(parts):
+                for key in [k for k in cache if k not in objects]:
+                    del cache[key]
+
+            with atomic_open(self.__file_path, fmt.binary,
+                             self.__generations) as file:
+                fmt.write(file, parts)
+        except Exception:
+            self.__restore_dirty(dirty)
+            raise
+        return objects
+
+    def __write_shards(self):
+        """rewrites the shards holding a dirty key, removing the files of
+        shards left empty"""
+        layout = self.__shards
+        with self.__writer:
+            shards = {layout.shard_of(key) for key in self.__dirty}
+            self.__load_shards(shards)
+            dirty, self.__dirty = self.__dirty, set()
+            index = self.__index()
+            contents = {shard: [] for shard in shards}
+            for class_name in {ShardLayout.class_of(shard)
+                               for shard in shards}:
+                for key in index.keys(class_name):
+                    entries = contents.get(layout.shard_of(key))
+                    if entries is not None:
+                        entries.append((key, dict.get(self.__objects, key)))
+        cache = self.__cache
+        for key in dirty:
+            cache.pop(key, None)
+        try:
+            for shard, entries in contents.items():
+                self.__write_shard(layout.path(shard), entries)
+        except Exception:
+            self.__restore_dirty(dirty)
+            raise
+
+    def __write_shard(self, path, entries):
+        """writes the (key, object) entries of a shard to path, removing
+        the file if there are none"""
+        if not entries:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        fmt = self.__format
+        cache = self.__cache
+        parts = []
+        for key, obj in entries:
+            entry = cache.get(key)
+            if entry is None or entry[0] is not obj:
+                entry = cache[key] = (obj, fmt.encode(key, obj))
+            parts.append(entry[1])
+        with atomic_open(path, fmt.binary, self.__generations) as file:
+            fmt.write(file, parts)
+
+    def use_compact_classes(self):
+        """Builds the instances created by reload() with the compact
+        __slots__ layout of models.compact, which keeps to_dict() and
+        __str__ output unchanged but needs less memory per object"""
+        self.__builders = {name: compact(cls) for name, cls
+                           in self.__current_classes.items()}
+        if isinstance(self.__objects, LazyObjects):
+            self.__objects.classes = self.__builders
+
+    def keep_generations(self, count):
+        """
+        Keeps the count previous versions of the file as file.json.1
+        (newest) to file.json.<count>; reload() falls back to them when
+        the current file cannot be read
+
+        Args:
+            count (int): number of previous versions, 0 keeps none
+        """
+        self.__generations = count
+
+    def export_jsonl(self, file, cls=None):
+        """
+        Writes the objects as JSON Lines, one to_dict() record per line,
+        streamed from a snapshot of the storage
+
+        Args:
+            file (str or file): path, replaced atomically, or text file
+            cls (type or str): only export the objects of this class
+        Returns:
+            int: number of records written
+        """
+        fmt = JSONLinesFormat()
+        objects = self.all(cls)
+        entries = (fmt.encode(key, value)
+                   for key, value in dict.items(objects))
+        if isinstance(file, str):
+            with atomic_open(file) as out:
+                fmt.write(out, entries)
+        else:
+            fmt.write(file, entries)
+        return len(objects)
+
+    def import_jsonl(self, file):
+        """
+        Reads JSON Lines records, e.g. from export_jsonl(), and stores an
+        instance for each, replacing objects with the same key; the file
+        is read as a stream and the storage saved once at the end
+        On error the objects stored so far are rolled back and nothing
+        is saved.
+
+        Args:
+            file (str or file): path or text file
+        Returns:
+            int: number of records imported
+        Raises:
+            ValueError: for a malformed line, an unknown __class__, or an
+                id or date of the wrong type
+        """
+        if isinstance(file, str):
+            with open(file, "r", encoding="UTF-8") as lines:
+                return self.import_jsonl(lines)
+        replaced = {}
+        count = 0
+        try:
+            for number, (_, record) in enumerate(
+                    JSONLinesFormat().read(file), 1):
+                class_name = record["__class__"]
+                if class_name not in self.__current_classes:
+                    raise ValueError(
+                        f"record {number}: unknown class {class_name}")
+                self.__check_record(number, record)
+                obj = self.__builders[class_name](**record)
+                key = f"{class_name}.{obj.id}"
+                if key not in replaced:
+                    self.__require(key=key)
+                    replaced[key] = self.__objects.get(key)
+                self.new(obj)
+                count += 1
+        except Exception:
+            for key, previous in replaced.items():
+                if previous is not None:
+                    self.new(previous)
+                else:
+                    self.delete(self.__objects.get(key))
+            raise
+        if count:
+            self.save()
+        return count
+
+    @staticmethod
+    def __check_record(number, record):
+        """raises ValueError if the id or dates of the imported record
+        number are not strings, or the dates not ISO 8601 datetimes"""
+        if type(record.get("id", "")) is not str:
+            raise ValueError(f"record {number}: id is not a string")
+        for name in DATE_KEYS:
+            if name in record:
+                try:
+                    datetime.fromisoformat(record[name])
+                except (TypeError, ValueError):
+                    raise ValueError(f"record {number}: {name} is not an "
+                                     "ISO 8601 datetime") from None
+
+    @staticmethod
+    def __record(obj):
+        """returns the dict form of a stored value
+        values not yet built by a lazy reload already are that dict"""
+        if type(obj) is dict:
+            return obj
+        return obj.to_dict()
+
+    def reload(self, lazy=False, workers=1):
+        """Deserializes the JSON file to objects
+        The file is parsed one top-level key at a time and each object is
+        built as soon as its record is read
+        After enable_sharing() the file is only read again when another
+        process wrote it, and merged instead of loaded (see refresh())
+        After enable_shards() a lazy reload also defers reading each shard
+        until its class is first used, and a full reload can decode the
+        shards in parallel
+
+        Args:
+            lazy (bool): keep the raw records and only build an instance
+                when its key is first accessed through all() or get()
+            workers (int): number of processes decoding the shard files,
+                1 reads them in this process; only used with shards and
+                without lazy, and not while models is being imported, as
+                the workers would wait for that import
+        """
+        with self.__writer:
+            if lazy and not isinstance(self.__objects, LazyObjects):
+                self.__objects = LazyObjects(self.__builders,
+                                             dict.items(self.__objects),
+                                             lock=self.__writer)
+        try:
+            if self.__journal:
+                self.__load(self.__journal.read().items(), lazy)
+            elif self.__lock:
+                self.refresh()
+            elif self.__shards:
+                self.__lazy_shards = lazy
+                self.__unloaded = frozenset(self.__shards.shards())
+                if not lazy and workers > 1:
+                    self.__load_shards_parallel(workers)
+                elif not lazy:
+                    self.__require()
+            else:
+                self.__load_file(lazy)
+        except Exception:
+            pass
+
+    def __load_file(self, lazy, file_path=None, accept=None):
+        """
+        loads the newest readable generation of a storage file
+        Args:
+            lazy (bool): keep the raw records
+            file_path (str): file to load, the storage file if None
+            accept (callable): only load the keys it returns True for
+        """
+        for path in generation_paths(file_path or self.__file_path,
+                                     self.__generations):
+            if not os.path.exists(path):
+                continue
             try:
-                with open(self.__file_path, "r") as file:
-                    new_obj = json.load(file)
-                    for key, val in new_obj.items():
-                        # obj = BaseModel(**val)
-                        # self.__objects[key] = obj
-                        class_name = val['__class__']
-                        if class_name in self.__current_classes:
-                            class_obj = self.__current_classes[class_name]
-                            obj = class_obj(**val)
-                            self.__objects[key] = obj
+                with open_file(path, self.__format, "r") as file:
+                    records = self.__format.read(file)
+                    if accept:
+                        records = ((key, val) for key, val in records
+                                   if accept(key))
+                    self.__load(records, lazy)
+                return
             except Exception:
-                pass
+                continue
+
+    def __load(self, records, lazy=False):
+        """builds and stores an instance for every (key, dict) record"""
+        with self.__writer:
+            self.__snapshot = None
+            self.__load_records(records, lazy)
+
+    def __load_records(self, records, lazy):
+        """__load() body, run under the writer lock"""
+        index = self.__index()
+        for key, val in records:
+            # obj = BaseModel(**val)
+            # self.__objects[key] = obj
+            class_name = val['__class__']
+            if class_name in self.__current_classes:
+                if lazy:
+                    dict.__setitem__(self.__objects, key, val)
+                else:
+                    class_obj = self.__builders[class_name]
+                    obj = class_obj(**val)
+                    self.__objects[key] = obj
+                index.add(key)
+                self.__reindex(key, val)
+                self.__dirty.discard(key)
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""Module for BackgroundFlusher class."""
+
+import threading
+
+
+class BackgroundFlusher:
+    """Thread that writes the storage file on behalf of save()
+    save() only hands a request over; the requests that arrive while a
+    write is running are coalesced into the next single write."""
+
+    def __init__(self, flush):
+        """
+        Initialize and start the thread
+        Args:
+            flush (callable): writes every pending save
+        """
+        self.__flush = flush
+        self.__condition = threading.Condition()
+        self.__requests = 0
+        self.__busy = False
+        self.__closed = False
+        self.error = None
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def request(self):
+        """asks for a write of the pending saves"""
+        with self.__condition:
+            if self.__closed:
+                raise ValueError("the background flusher is closed")
+            self.__requests += 1
+            self.__condition.notify_all()
+
+    def depth(self):
+        """returns the number of requests waiting for the next write"""
+        return self.__requests
+
+    def wait(self):
+        """blocks until every request made so far is written
+        Raises:
+            Exception: the error of the last failed write, once
+        """
+        with self.__condition:
+            while self.__requests or self.__busy:
+                self.__condition.wait()
+            error, self.error = self.error, None
+        if error:
+            raise error
+
+    def close(self):
+        """writes the waiting requests and stops the thread"""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__thread.join()
+        error, self.error = self.error, None
+        if error:
+            raise error
+
+    def __run(self):
+        """writes whenever requests are waiting, until closed"""
+        while True:
+            with self.__condition:
+                while not self.__requests and not self.__closed:
+                    self.__condition.wait()
+                if not self.__requests:
+                    return
+                self.__requests = 0
+                self.__busy = True
+            try:
+                self.__flush()
+            except Exception as error:
+                self.error = error
+            finally:
+                with self.__condition:
+                    self.__busy = False
+                    self.__condition.notify_all()
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""Module for the file formats FileStorage can save to and reload from.
+
+convert_storage.py at the top of the repository converts a file from
+one format to another.
+"""
+
+import json
+import pickle
+from datetime import datetime
+from models.engine.atomic_file import atomic_open
+from models.engine.json_stream import iter_items
+
+DATETIME_KEYS = ("created_at", "updated_at")
+
+
+class JSONFormat:
+    """file.json layout: one JSON object of to_dict() records keyed by
+    Class.id, datetimes as ISO 8601 strings"""
+
+    name = "json"
+    file_name = "file.json"
+    binary = False
+
+    def encode(self, key, value):
+        """
+        returns the encoded entry of one stored value
+        Args:
+            key (str): Class.id key
+            value: model instance or raw record dict
+        """
+        record = value if type(value) is dict else value.to_dict()
+        encoded = json.dumps(record, default=_isoformat)
+        return f"{json.dumps(key)}: {encoded}"
+
+    def write(self, file, entries):
+        """writes encoded entries to a file opened in text mode"""
+        file.write("{" + ", ".join(entries) + "}")
+
+    def read(self, file):
+        """yields the (key, record) pairs of a file opened in text mode"""
+        return iter_items(file)
+
+
+class BinaryFormat:
+    """Pickle protocol 5 of the records keyed by Class.id, with
+    created_at/updated_at kept as native datetime values so neither save
+    nor reload go through ISO 8601 strings"""
+
+    name = "binary"
+    file_name = "file.bin"
+    binary = True
+
+    def encode(self, key, value):
+        """
+        returns the encoded entry of one stored value
+        Args:
+            key (str): Class.id key
+            value: model instance or raw record dict
+        """
+        if type(value) is dict:
+            record = value.copy()
+            for name in DATETIME_KEYS:
+                if isinstance(record.get(name), str):
+                    record[name] = datetime.fromisoformat(record[name])
+        else:
+            record = value.to_dict(native_dates=True)
+        return key, record
+
+    def write(self, file, entries):
+        """writes encoded entries to a file opened in binary mode"""
+        pickle.dump(dict(entries), file, protocol=5)
+
+    def read(self, file):
+        """yields the (key, record) pairs of a file opened in binary mode"""
+        return iter(_RecordUnpickler(file).load().items())
+
+
+class JSONLinesFormat:
+    """JSON Lines: one to_dict() record per line, the key rebuilt from
+    __class__ and id, so files can be written and read as a stream and
+    concatenated"""
+
+    name = "jsonl"
+    file_name = "file.jsonl"
+    binary = False
+
+    def encode(self, key, value):
+        """
+        returns the line of one stored value, without the newline
+        Args:
+            key (str): Class.id key
+            value: model instance or raw record dict
+        """
+        record = value if type(value) is dict else value.to_dict()
+        return json.dumps(record, default=_isoformat)
+
+    def write(self, file, entries):
+        """writes encoded entries to a file opened in text mode"""
+        for entry in entries:
+            file.write(entry + "\n")
+
+    def read(self, file):
+        """
+        yields the (key, record) pairs of a file opened in text mode,
+        skipping blank lines
+        Raises:
+            ValueError: for a line that is not a record with __class__
+        """
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"line {number}: {error}") from None
+            if type(record) is not dict or "__class__" not in record:
+                raise ValueError(f"line {number}: record without __class__")
+            yield f"{record['__class__']}.{record.get('id')}", record
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    """Unpickler that only accepts the types records are made of"""
+
+    def find_class(self, module, name):
+        """allows datetime and refuses any other global"""
+        if module == "datetime" and name == "datetime":
+            return datetime
+        raise pickle.UnpicklingError(f"global {module}.{name} not allowed")
+
+
+def _isoformat(value):
+    """json default hook for datetimes left in raw binary records"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+FORMATS = {
+    JSONFormat.name: JSONFormat,
+    BinaryFormat.name: BinaryFormat,
+    JSONLinesFormat.name: JSONLinesFormat,
+}
+
+
+def get_format(name):
+    """returns a format instance from its name"""
+    if name not in FORMATS:
+        raise ValueError(f"unknown storage format: {name}")
+    return FORMATS[name]()
+
+
+def convert(src_path, src_format, dst_path, dst_format):
+    """
+    Rewrites a storage file in another format
+    Args:
+        src_path (str): file to read
+        src_format (str): format name of src_path
+        dst_path (str): file to write
+        dst_format (str): format name of dst_path
+    """
+    src = get_format(src_format)
+    dst = get_format(dst_format)
+    with open_file(src_path, src, "r") as file:
+        entries = [dst.encode(key, record) for key, record in src.read(file)]
+    with atomic_open(dst_path, dst.binary) as file:
+        dst.write(file, entries)
+
+
+def open_file(path, fmt, mode):
+    """opens path for reading ("r") or writing ("w") in the text or
+    binary mode fmt expects"""
+    if fmt.binary:
+        return open(path, mode + "b")
+    return open(path, mode, encoding="UTF-8")
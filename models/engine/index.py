@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""Module for the secondary indexes kept by FileStorage."""
+
+
+class ClassIndex:
+    """Keys of the stored objects grouped by class name
+    Keys keep their insertion order within a class, which is also kept
+    as a list with the position of each key, so iterating from a key
+    does not walk the keys before it"""
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.__keys = {}
+        self.__order = {}
+        self.size = 0
+
+    def add(self, key):
+        """adds a Class.id key"""
+        name = key.partition(".")[0]
+        keys = self.__keys.setdefault(name, {})
+        if key not in keys:
+            order = self.__order.setdefault(name, [])
+            keys[key] = len(order)
+            order.append(key)
+            self.size += 1
+
+    def remove(self, key):
+        """removes a Class.id key"""
+        name = key.partition(".")[0]
+        keys = self.__keys.get(name)
+        if keys and key in keys:
+            order = self.__order[name]
+            order[keys.pop(key)] = None
+            self.size -= 1
+            if len(order) > 2 * len(keys) + 64:
+                # a new list, iterators of keys_after() keep the old one
+                order = self.__order[name] = list(keys)
+                for position, kept in enumerate(order):
+                    keys[kept] = position
+
+    def keys(self, class_name):
+        """returns the keys of class_name in insertion order"""
+        return self.__keys.get(class_name, {}).keys()
+
+    def keys_after(self, class_name, key=None):
+        """
+        returns an iterator over the keys of class_name in insertion
+        order, starting after key, of the keys present when it is called
+        Raises:
+            KeyError: if key is not a key of class_name
+        """
+        start = 0 if key is None else self.__keys[class_name][key] + 1
+        order = self.__order.get(class_name, [])
+        return (order[position] for position in range(start, len(order))
+                if order[position] is not None)
+
+    def count(self, class_name):
+        """returns the number of keys of class_name"""
+        return len(self.__keys.get(class_name, ()))
+
+
+class AttributeIndex:
+    """Keys of the objects of one class grouped by the value of one
+    of their attributes, e.g. City keys by state_id"""
+
+    def __init__(self, class_name, attribute):
+        """
+        Initialize an empty index
+        Args:
+            class_name (str): name of the indexed model class
+            attribute (str): name of the indexed attribute
+        """
+        self.class_name = class_name
+        self.attribute = attribute
+        self.__keys = {}
+        self.__values = {}
+
+    def add(self, key, value):
+        """indexes key under value, moving it if its value changed"""
+        if key in self.__values:
+            if self.__values[key] == value:
+                return
+            self.remove(key)
+        try:
+            self.__keys.setdefault(value, {})[key] = None
+        except TypeError:
+            # unhashable values are left out of the index
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """removes key from the index"""
+        if key in self.__values:
+            value = self.__values.pop(key)
+            keys = self.__keys[value]
+            del keys[key]
+            if not keys:
+                del self.__keys[value]
+
+    def keys(self, value):
+        """returns the keys whose attribute equals value"""
+        try:
+            return self.__keys.get(value, {}).keys()
+        except TypeError:
+            return {}.keys()
@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""Module for Journal class."""
+
+import json
+import os
+import threading
+from models.engine.atomic_file import atomic_open
+
+
+class Journal:
+    """Append-only log of create/update/destroy records kept next to
+    the JSON snapshot, compacted into the snapshot in the background"""
+
+    def __init__(self, snapshot_path, threshold=1 << 20):
+        """
+        Initialize a journal
+        Args:
+            snapshot_path (str): path of the JSON snapshot file
+            threshold (int): log size in bytes that triggers compaction
+        """
+        self.snapshot_path = snapshot_path
+        self.log_path = snapshot_path + ".log"
+        self.frozen_path = snapshot_path + ".log.1"
+        self.threshold = threshold
+        self.__lock = threading.Lock()
+        self.__compactor = None
+
+    def append(self, records):
+        """
+        Appends records to the log and starts a compaction when the log
+        passed the size threshold
+
+        Args:
+            records (list): (key, dict) pairs, dict is None for a destroy
+        """
+        lines = []
+        for key, value in records:
+            if value is None:
+                lines.append(json.dumps({"op": "del", "key": key}))
+            else:
+                lines.append(json.dumps({"op": "set", "key": key,
+                                         "value": value}))
+        if not lines:
+            return
+        with self.__lock:
+            self.__drop_torn_tail()
+            with open(self.log_path, "a", encoding="UTF-8") as file:
+                file.write("\n".join(lines) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            size = os.path.getsize(self.log_path)
+        if size >= self.threshold:
+            self.compact()
+
+    def __drop_torn_tail(self):
+        """truncates the log after its last complete record, so that a
+        record appended after a torn write starts on its own line"""
+        try:
+            file = open(self.log_path, "r+b")
+        except FileNotFoundError:
+            return
+        with file:
+            end = position = file.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(4096, position)
+                file.seek(position - step)
+                newline = file.read(step).rfind(b"\n")
+                if newline != -1:
+                    position += newline + 1 - step
+                    break
+                position -= step
+            if position != end:
+                file.truncate(position)
+
+    def compact(self, wait=False):
+        """
+        Freezes the current log and folds it into the snapshot
+        on a background thread
+
+        Args:
+            wait (bool): block until the compaction is done
+        """
+        if self.__compactor and self.__compactor.is_alive():
+            if wait:
+                self.__compactor.join()
+            return
+        with self.__lock:
+            if not os.path.exists(self.frozen_path):
+                if not os.path.exists(self.log_path):
+                    return
+                os.replace(self.log_path, self.frozen_path)
+        self.__compactor = threading.Thread(target=self.__compact,
+                                            daemon=True)
+        self.__compactor.start()
+        if wait:
+            self.__compactor.join()
+
+    def __compact(self):
+        """rewrites the snapshot with the frozen log applied"""
+        records = self.__read_snapshot()
+        self.__replay(self.frozen_path, records)
+        with atomic_open(self.snapshot_path) as file:
+            json.dump(records, file)
+        # replaying the frozen log again on the new snapshot is harmless,
+        # only its removal must not happen in the middle of a read()
+        with self.__lock:
+            os.remove(self.frozen_path)
+
+    def read(self):
+        """returns the raw records of the snapshot plus the log tail"""
+        with self.__lock:
+            records = self.__read_snapshot()
+            self.__replay(self.frozen_path, records)
+            self.__replay(self.log_path, records)
+        return records
+
+    def __read_snapshot(self):
+        """returns the raw records of the snapshot file"""
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path, "r", encoding="UTF-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def __replay(path, records):
+        """applies the log at path to records
+        Raises:
+            ValueError: for an unreadable record other than the last one
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="UTF-8") as file:
+            torn = None
+            for number, line in enumerate(file, 1):
+                if torn is not None:
+                    raise ValueError(f"{path}: unreadable record on line "
+                                     f"{torn}")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # only a torn write at the tail of the log is skipped
+                    torn = number
+                    continue
+                if entry["op"] == "set":
+                    records[entry["key"]] = entry["value"]
+                else:
+                    records.pop(entry["key"], None)
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""Module for incremental parsing of the FileStorage JSON file."""
+
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_items(file, chunk_size=1 << 16):
+    """
+    Yields the (key, value) pairs of the top-level JSON object in file
+    one at a time, so only one record is held in memory
+    Args:
+        file: text file object opened for reading
+        chunk_size (int): number of characters read at a time
+    Raises:
+        ValueError: when the document is not a JSON object
+    """
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        """drops the consumed part of buf and reads the next chunk"""
+        nonlocal buf, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def peek():
+        """returns the next non-whitespace character, '' at the end"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            fill()
+
+    def expect(chars):
+        """consumes the next character, which must be one of chars"""
+        nonlocal pos
+        char = peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}",
+                                       buf, pos)
+        pos += 1
+        return char
+
+    def decode():
+        """decodes the JSON value starting at pos"""
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # a number touching the end of buf may continue in the
+            # next chunk
+            if end == len(buf) and not eof:
+                fill()
+                continue
+            pos = end
+            return value
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        key = decode()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", buf, pos)
+        expect(":")
+        yield key, decode()
+        if expect(",}") == "}":
+            return
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Module for LazyObjects class."""
+
+import threading
+from collections.abc import ItemsView, ValuesView
+
+
+class LazyObjects(dict):
+    """Dictionary of FileStorage objects that keeps the raw dict read from
+    the file for each key and only builds the model instance the first
+    time the key is accessed
+    Key lookups (in, len, iteration, keys()) never build an instance"""
+
+    def __init__(self, classes, *args, source=None, lock=None, **kwargs):
+        """
+        Initialize the mapping
+        Args:
+            classes (dict): class name to model class
+            source (LazyObjects): mapping this one was copied from, whose
+                instances are reused for the keys it still holds
+            lock (threading.RLock): held while an instance is built, the
+                lock of source by default, so that concurrent accesses
+                to a key all get the one stored instance
+        """
+        super().__init__(*args, **kwargs)
+        self.classes = classes
+        self.source = source
+        if lock is None:
+            lock = source.lock if source is not None else threading.RLock()
+        self.lock = lock
+
+    def __getitem__(self, key):
+        """returns the instance for key, building it on first access"""
+        value = super().__getitem__(key)
+        if type(value) is not dict:
+            return value
+        with self.lock:
+            value = super().__getitem__(key)
+            if type(value) is dict:
+                current = self.__source_value(key)
+                if current is value:
+                    value = self.source[key]
+                elif current is not None and type(current) is not dict:
+                    value = current
+                else:
+                    value = self.classes[value['__class__']](**value)
+                super().__setitem__(key, value)
+        return value
+
+    def __source_value(self, key):
+        """returns the value of key in the source mapping, or None"""
+        if self.source is None:
+            return None
+        return dict.get(self.source, key)
+
+    def is_loaded(self, key):
+        """returns True if the instance for key has already been built,
+        here or in the source mapping"""
+        if type(super().__getitem__(key)) is not dict:
+            return True
+        current = self.__source_value(key)
+        return current is not None and type(current) is not dict
+
+    def raw(self, key):
+        """returns the stored value for key without building it"""
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        """returns the instance for key or default"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        """removes key and returns its instance"""
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self):
+        """removes and returns the last (key, instance) pair"""
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        """returns the instance for key, storing default if missing"""
+        if key not in self:
+            super().__setitem__(key, default)
+        return self[key]
+
+    def values(self):
+        """returns a view that builds the instances as it is iterated"""
+        return ValuesView(self)
+
+    def items(self):
+        """returns a view that builds the instances as it is iterated"""
+        return ItemsView(self)
+
+    def copy(self):
+        """returns a shallow copy that shares the built instances, also
+        the ones built after the copy"""
+        return LazyObjects(self.classes, dict.items(self), source=self)
+
+    def __eq__(self, other):
+        """compares the mappings with every instance built"""
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        """compares the mappings with every instance built"""
+        return not self == other
+
+    __hash__ = None
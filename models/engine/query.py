@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Module for the predicate and ordering helpers of FileStorage.query()."""
+
+import heapq
+from models.engine.columns import OPERATORS
+
+
+def compile_predicates(predicates):
+    """
+    returns the (attribute, comparison function, value) checks of
+    (attribute, operator, value) predicates
+    Raises:
+        ValueError: for an operator other than < <= > >= == !=
+    """
+    checks = []
+    for attribute, op, value in predicates:
+        if op not in OPERATORS:
+            raise ValueError(f"unknown operator: {op}")
+        checks.append((attribute, OPERATORS[op], value))
+    return checks
+
+
+def matches(value, checks, attribute):
+    """
+    returns True if every check holds for a stored value
+    Comparisons between values that cannot be compared (e.g. None < 80)
+    do not hold
+    Args:
+        value: model instance or raw record
+        checks (list): compile_predicates() result
+        attribute (callable): reads attribute name of value
+    """
+    try:
+        for name, compare, expected in checks:
+            if not compare(attribute(value, name), expected):
+                return False
+    except TypeError:
+        return False
+    return True
+
+
+def ordered(objects, order, count=None):
+    """
+    returns the objects sorted by attribute names, descending for names
+    prefixed with -; equal objects keep their order
+    Args:
+        objects (iterable): model instances
+        order (list): attribute names, e.g. ["city_id", "-price_by_night"]
+        count (int): only the first count objects are needed
+    Raises:
+        ValueError: if the values of an attribute cannot be compared
+    """
+    keys = [(name.lstrip("-"), name.startswith("-")) for name in order]
+    try:
+        if len(keys) == 1 and count is not None:
+            name, reverse = keys[0]
+            pick = heapq.nlargest if reverse else heapq.nsmallest
+            return pick(count, objects,
+                        key=lambda obj: getattr(obj, name, None))
+        objects = list(objects)
+        for name, reverse in reversed(keys):
+            objects.sort(key=lambda obj: getattr(obj, name, None),
+                         reverse=reverse)
+        return objects
+    except TypeError:
+        raise ValueError(
+            f"cannot order by {', '.join(order)}: values of "
+            "different types") from None
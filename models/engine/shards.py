@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""Module for ShardLayout class."""
+
+import os
+import zlib
+from datetime import datetime
+from models.engine.atomic_file import generation_paths
+from models.engine.formats import DATETIME_KEYS, get_format, open_file
+
+
+class ShardLayout:
+    """Splits the storage into one file per class, e.g. shards/Place.json,
+    or per class and hash bucket of the id, e.g. shards/Place.3.json
+    The bucket of an id is its crc32 modulo the number of buckets, which
+    is the same in every process; the number of buckets of a directory
+    must not change once files were written."""
+
+    def __init__(self, directory, buckets=0, extension=".json"):
+        """
+        Initialize the layout
+        Args:
+            directory (str): directory of the shard files
+            buckets (int): number of files per class, 0 for one file
+            extension (str): file extension of the storage format
+        """
+        self.directory = directory
+        self.buckets = buckets
+        self.extension = extension
+
+    def shard_of(self, key):
+        """returns the name of the shard holding a Class.id key"""
+        class_name, _, id = key.partition(".")
+        if not self.buckets:
+            return class_name
+        return f"{class_name}.{zlib.crc32(id.encode()) % self.buckets}"
+
+    @staticmethod
+    def class_of(shard):
+        """returns the class name of a shard"""
+        return shard.partition(".")[0]
+
+    def path(self, shard):
+        """returns the path of the file of a shard"""
+        return os.path.join(self.directory, shard + self.extension)
+
+    def shards(self):
+        """returns the names of the shards that have a file"""
+        if not os.path.isdir(self.directory):
+            return []
+        size = len(self.extension)
+        return sorted(name[:-size] for name in os.listdir(self.directory)
+                      if name.endswith(self.extension))
+
+
+def read_shard(path, format_name, generations=0, classes=None):
+    """
+    Decodes the newest readable generation of a shard file, with
+    created_at/updated_at parsed to datetimes, in a worker process of a
+    parallel reload
+    Args:
+        path (str): shard file
+        format_name (str): storage format of the file
+        generations (int): previous versions to fall back to
+        classes (dict): class name to model class, to build the instances
+            here (they unpickle faster than they are built)
+    Returns:
+        list: (key, record) pairs, or (key, instance) pairs with classes,
+            empty if no generation is readable
+    """
+    fmt = get_format(format_name)
+    for candidate in generation_paths(path, generations):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open_file(candidate, fmt, "r") as file:
+                records = list(fmt.read(file))
+        except Exception:
+            continue
+        for _, record in records:
+            for name in DATETIME_KEYS:
+                if isinstance(record.get(name), str):
+                    record[name] = datetime.fromisoformat(record[name])
+        if classes is not None:
+            return [(key, classes[record['__class__']](**record))
+                    for key, record in records
+                    if record['__class__'] in classes]
+        return records
+    return []
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+"""Module for the read-only snapshots returned by FileStorage.all()."""
+
+from models.engine.lazy_objects import LazyObjects
+
+
+def _read_only(self, *args, **kwargs):
+    """refuses to change a snapshot"""
+    raise TypeError("all() returns a read-only snapshot, "
+                    "use new() and delete() to change the storage")
+
+
+class Snapshot(dict):
+    """Copy of the stored objects that cannot be changed, so changing it
+    by mistake raises instead of leaving the storage unchanged
+    copy() returns a regular dict"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    pop = popitem = clear = update = setdefault = _read_only
+
+
+class LazySnapshot(LazyObjects):
+    """Snapshot of the objects of a lazy reload, whose instances are still
+    built on first access and shared with the source mapping"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    pop = popitem = clear = update = setdefault = _read_only
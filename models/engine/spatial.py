@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+"""Module for GeoGrid class."""
+
+from math import asin, cos, degrees, floor, isnan, pi, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class GeoGrid:
+    """Keys of the objects of one class bucketed in a grid of
+    latitude/longitude cells, so radius, bounding-box and nearest
+    queries only compute distances for the points of nearby cells
+    Objects whose coordinates are not numbers are not indexed."""
+
+    def __init__(self, class_name, attributes=("latitude", "longitude"),
+                 cell_size=0.25):
+        """
+        Initialize an empty grid
+        Args:
+            class_name (str): name of the model class
+            attributes (tuple): names of the latitude and longitude
+                attributes
+            cell_size (float): side of a cell in degrees
+        """
+        self.class_name = class_name
+        self.attributes = tuple(attributes)
+        self.cell_size = cell_size
+        self.__columns = int(360 // cell_size) + 1
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """returns the number of indexed points"""
+        return len(self.__points)
+
+    def add(self, key, latitude, longitude):
+        """
+        indexes key at the given coordinates, moving it if it was
+        already indexed
+        Args:
+            key (str): Class.id key
+            latitude: latitude in degrees, -90 to 90
+            longitude: longitude in degrees
+        """
+        self.remove(key)
+        latitude = _coordinate(latitude)
+        longitude = _coordinate(longitude)
+        if latitude is None or longitude is None or abs(latitude) > 90:
+            return
+        longitude = _normalize(longitude)
+        cell = (self.__row(latitude), self.__column(longitude))
+        self.__cells.setdefault(cell, {})[key] = (latitude, longitude)
+        self.__points[key] = cell
+
+    def remove(self, key):
+        """removes key from the grid"""
+        cell = self.__points.pop(key, None)
+        if cell is not None:
+            points = self.__cells[cell]
+            del points[key]
+            if not points:
+                del self.__cells[cell]
+
+    def within(self, south, west, north, east):
+        """
+        returns the keys inside a bounding box, edges included
+        A box with west greater than east crosses the antimeridian
+
+        Args:
+            south (float): minimum latitude
+            west (float): western longitude
+            north (float): maximum latitude
+            east (float): eastern longitude
+        """
+        return [key for key, _, _ in self.__box(south, west, north, east)]
+
+    def near(self, latitude, longitude, radius):
+        """
+        returns (distance, key) pairs of the points at most radius
+        kilometers away, nearest first
+        Args:
+            latitude (float): latitude of the center
+            longitude (float): longitude of the center
+            radius (float): radius in kilometers
+        """
+        angle = radius / EARTH_RADIUS_KM
+        if angle >= pi:
+            box = (-90, -180, 90, 180)
+        else:
+            south = latitude - degrees(angle)
+            north = latitude + degrees(angle)
+            if abs(radians(latitude)) + angle >= pi / 2:
+                # the circle contains a pole, every longitude is close
+                box = (max(south, -90), -180, min(north, 90), 180)
+            else:
+                width = degrees(asin(sin(angle) / cos(radians(latitude))))
+                box = (south, _normalize(longitude - width),
+                       north, _normalize(longitude + width))
+        hits = []
+        for key, lat, lon in self.__box(*box):
+            length = distance(latitude, longitude, lat, lon)
+            if length <= radius:
+                hits.append((length, key))
+        hits.sort()
+        return hits
+
+    def nearest(self, latitude, longitude, count=1):
+        """
+        returns (distance, key) pairs of the count nearest points,
+        nearest first
+        The search radius starts at one cell and grows until enough
+        points are found or it covers the whole globe.
+
+        Args:
+            latitude (float): latitude of the center
+            longitude (float): longitude of the center
+            count (int): number of points to return
+        """
+        if count < 1 or not self.__points:
+            return []
+        radius = radians(self.cell_size) * EARTH_RADIUS_KM
+        while True:
+            hits = self.near(latitude, longitude, radius)
+            if len(hits) >= count or radius >= pi * EARTH_RADIUS_KM:
+                return hits[:count]
+            radius *= 4
+
+    def __box(self, south, west, north, east):
+        """yields (key, latitude, longitude) of the points in a box"""
+        rows = range(self.__row(max(south, -90)),
+                     self.__row(min(north, 90)) + 1)
+        if east - west >= 360:
+            west, east = -180, 180
+        else:
+            west, east = _normalize(west), _normalize(east)
+            if east == -180:
+                east = 180
+        if west <= east:
+            columns = range(self.__column(west), self.__column(east) + 1)
+        else:
+            columns = [*range(self.__column(west), self.__columns),
+                       *range(0, self.__column(east) + 1)]
+
+        if len(rows) * len(columns) > len(self.__cells):
+            columns = set(columns)
+            cells = [points for (row, column), points in self.__cells.items()
+                     if row in rows and column in columns]
+        else:
+            cells = [self.__cells[(row, column)]
+                     for row in rows for column in columns
+                     if (row, column) in self.__cells]
+        for points in cells:
+            for key, (lat, lon) in points.items():
+                if not south <= lat <= north:
+                    continue
+                if (west <= lon <= east if west <= east
+                        else lon >= west or lon <= east):
+                    yield key, lat, lon
+
+    def __row(self, latitude):
+        """returns the row of the cells containing latitude"""
+        return int(floor((latitude + 90) / self.cell_size))
+
+    def __column(self, longitude):
+        """returns the column of the cells containing longitude"""
+        return int(floor((longitude + 180) / self.cell_size))
+
+
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """returns the great-circle distance in kilometers between two
+    points, computed with the haversine formula"""
+    phi1, phi2 = radians(latitude1), radians(latitude2)
+    half = (sin((phi2 - phi1) / 2) ** 2
+            + cos(phi1) * cos(phi2)
+            * sin(radians(longitude2 - longitude1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(half)))
+
+
+def _normalize(longitude):
+    """returns longitude in the range -180 (included) to 180"""
+    return (longitude + 180) % 360 - 180
+
+
+def _coordinate(value):
+    """returns value as a float, None if it is not a number"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if isnan(value) or abs(value) == float("inf") else value
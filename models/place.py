@@ -17,3 +17,7 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+    indexed_attributes = ("city_id", "user_id")
+    columnar_attributes = ("number_rooms", "number_bathrooms", "max_guest",
+                           "price_by_night", "latitude", "longitude")
+    spatial_attributes = ("latitude", "longitude")
@@ -5,7 +5,22 @@ import pycodestyle
 FILES_TO_CHECK = [
     "models/__init__.py",
     "models/engine/file_storage.py",
+    "models/engine/async_storage.py",
+    "models/engine/atomic_file.py",
+    "models/engine/columns.py",
+    "models/engine/file_lock.py",
+    "models/engine/flusher.py",
+    "models/engine/formats.py",
+    "models/engine/index.py",
+    "models/engine/journal.py",
+    "models/engine/json_stream.py",
+    "models/engine/lazy_objects.py",
+    "models/engine/query.py",
+    "models/engine/shards.py",
+    "models/engine/snapshot.py",
+    "models/engine/spatial.py",
     "models/base_model.py",
+    "models/compact.py",
     "models/user.py",
     "models/state.py",
     "models/city.py",
@@ -13,11 +28,33 @@ FILES_TO_CHECK = [
     "models/place.py",
     "models/review.py",
     "console.py",
+    "convert_storage.py",
+    "benchmarks/bench_memory.py",
+    "benchmarks/bench_select.py",
+    "benchmarks/bench_flush.py",
+    "benchmarks/bench_reload.py",
+    "benchmarks/bench_dates.py",
+    "benchmarks/bench_console.py",
     "tests/test_models/test_base_model.py",
+    "tests/test_models/test_compact.py",
     "tests/test_console.py",
     "tests/test_docstrings.py",
     "tests/test_code_style.py",
     "tests/test_models/test_engine/test_file_storage.py",
+    "tests/test_models/test_engine/test_async_storage.py",
+    "tests/test_models/test_engine/test_atomic_file.py",
+    "tests/test_models/test_engine/test_columns.py",
+    "tests/test_models/test_engine/test_file_lock.py",
+    "tests/test_models/test_engine/test_flusher.py",
+    "tests/test_models/test_engine/test_formats.py",
+    "tests/test_models/test_engine/test_index.py",
+    "tests/test_models/test_engine/test_journal.py",
+    "tests/test_models/test_engine/test_json_stream.py",
+    "tests/test_models/test_engine/test_lazy_objects.py",
+    "tests/test_models/test_engine/test_query.py",
+    "tests/test_models/test_engine/test_shards.py",
+    "tests/test_models/test_engine/test_snapshot.py",
+    "tests/test_models/test_engine/test_spatial.py",
     "tests/test_models/test_user.py",
     "tests/test_models/test_state.py",
     "tests/test_models/test_city.py",
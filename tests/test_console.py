@@ -1,7 +1,10 @@
+import os
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from io import StringIO
 from console import HBNBCommand, validate_classname, validate_attrs
+from console import Command, command_of, parse, parse_call, tokenize
+from console import query_value
 from models import storage
 from models.base_model import BaseModel
 from models.user import User
@@ -141,6 +144,89 @@ class TestPreCmdMethod(unittest.TestCase):
         self.assertEqual('\n', result)
 
 
+class TestParse(unittest.TestCase):
+    """Unittests for the command parser of the console."""
+
+    def assertCommand(self, command, name, args, attributes=None):
+        """Assert the fields of a Command"""
+        self.assertEqual((command.name, command.args, command.attributes),
+                         (name, args, attributes))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize(""), ([], None))
+        self.assertEqual(tokenize('123, name, "John Doe"'),
+                         (["123", "name", "John Doe"], None))
+        self.assertEqual(tokenize("a,b 'c d', \"\" {x"),
+                         (["a,b", "c d", "", "{x"], None))
+        self.assertEqual(tokenize('"1", {"a": 1, \'b\': [2]}'),
+                         (["1"], {"a": 1, "b": [2]}))
+        self.assertEqual(tokenize('"{not}" {1, 2}'),
+                         (["{not}", "{1, 2}"], None))
+
+    def test_query_value(self):
+        self.assertEqual(query_value(Place, "max_guest", '"4"'), 4)
+        self.assertEqual(query_value(Place, "latitude", "1"), 1.0)
+        self.assertEqual(query_value(Place, "price_by_night", "9.5"), 9.5)
+        self.assertEqual(query_value(Place, "city_id", "12"), "12")
+        self.assertEqual(query_value(Place, "extra", "12"), 12)
+        self.assertEqual(query_value(Place, "extra", "'12'"), "12")
+        with self.assertRaises(ValueError):
+            query_value(Place, "max_guest", "'x'")
+
+    def test_tokenize_quoted_parts(self):
+        self.assertEqual(tokenize('name="Le Loft", fields=a,b x"y'),
+                         (['name="Le Loft"', "fields=a,b", 'x"y'], None))
+
+    def test_parse_call(self):
+        self.assertIsNone(parse_call("show User 1"))
+        self.assertCommand(parse_call("User.count()"), "count", ["User"])
+        self.assertCommand(
+            parse_call('User.update("1", {"name": "John Doe"})'),
+            "update", ["User", "1"], {"name": "John Doe"})
+
+    def test_parse(self):
+        self.assertIsNone(parse("  "))
+        self.assertCommand(parse('update User 1 name "John Doe"'),
+                           "update", ["User", "1", "name", "John Doe"])
+        self.assertCommand(parse("Place.all()"), "all", ["Place"])
+        self.assertCommand(command_of("show", "User 1"),
+                           "show", ["User", "1"])
+        command = Command("show", ["User", "1"])
+        self.assertIs(command_of("show", command), command)
+
+    def test_update_dotted_value_with_space(self):
+        user = User()
+        HBNBCommand().onecmd(f'User.update("{user.id}", name, "John Doe")')
+        self.assertEqual(storage.get(User, user.id).name, "John Doe")
+        storage.delete(storage.get(User, user.id))
+
+    def test_update_converts_to_class_default_type(self):
+        place = Place()
+        for command, correct in (
+                (f"update Place {place.id} max_guest 4", ""),
+                (f"update Place {place.id} max_guest many",
+                 "** invalid value for max_guest: 'many' **")):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct, mock_stdout.getvalue().strip())
+        self.assertIs(storage.get(Place, place.id), place)
+        self.assertEqual(place.max_guest, 4)
+        storage.delete(place)
+
+    def test_update_dict_saves_once(self):
+        place = Place()
+        place.number_rooms = 2
+        with patch.object(storage, "save") as mock_save:
+            HBNBCommand().onecmd(
+                f'Place.update("{place.id}", '
+                '{"name": "Loft", "number_rooms": "3", "extra": 1})')
+        self.assertEqual(mock_save.call_count, 1)
+        updated = storage.get(Place, place.id)
+        self.assertEqual((updated.name, updated.number_rooms, updated.extra),
+                         ("Loft", 3, 1))
+        storage.delete(updated)
+
+
 class TestCreateMethod(unittest.TestCase):
     """Test class for the do_create() method of the HBNBCommand class."""
 
@@ -669,6 +755,276 @@ class TestAllMethod(unittest.TestCase):
             self.assertIn("Review", mock_stdout.getvalue().strip())
             self.assertNotIn("BaseModel", mock_stdout.getvalue().strip())
 
+    def test_count_space_and_dot_notation(self):
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            HBNBCommand().onecmd("count State")
+            count = int(mock_stdout.getvalue())
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd("create State"))
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd("State.count()"))
+            self.assertEqual(str(count + 1), mock_stdout.getvalue().strip())
+
+
+class TestAllPages(unittest.TestCase):
+    """Unittests for the streamed and paginated output of all."""
+
+    def setUp(self):
+        """Creates five amenities"""
+        self.amenities = [Amenity(name=str(n)) for n in range(5)]
+        for amenity in self.amenities:
+            storage.new(amenity)
+        self.strings = [str(amenity) for amenity in self.amenities]
+
+    def tearDown(self):
+        """Removes the amenities"""
+        for amenity in self.amenities:
+            storage.delete(amenity)
+
+    def all_output(self, command):
+        """returns the output of a command"""
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(command))
+        return mock_stdout.getvalue()
+
+    def test_same_format(self):
+        strings = [str(obj) for obj in storage.all(Amenity).values()]
+        self.assertEqual(self.all_output("all Amenity"), f"{strings}\n")
+        strings = [str(obj) for obj in storage.all().values()]
+        self.assertEqual(self.all_output("all"), f"{strings}\n")
+
+    def test_pages(self):
+        key = f"Amenity.{self.amenities[1].id}"
+        for command, expected in (
+                ("all Amenity limit=0", ""),
+                (f"all Amenity after={key} limit=2", self.strings[2:4]),
+                (f"Amenity.all(after={key}, offset=2)", self.strings[4:])):
+            with self.subTest(command=command):
+                self.assertEqual(self.all_output(command),
+                                 f"{expected}\n" if expected else "")
+        page = self.all_output(f"all limit=1 after={key}")
+        self.assertEqual(page, f"{self.strings[2:3]}\n")
+
+    def test_errors(self):
+        for command, correct in (
+                ("all Amenity limit=many", "** invalid limit **"),
+                ("all offset=-1", "** invalid offset **"),
+                ("all Amenity after=Amenity.missing",
+                 "** no instance found **"),
+                (f"all User after=Amenity.{self.amenities[0].id}",
+                 "** no instance found **"),
+                ("all MyModel limit=1", "** class doesn't exist **")):
+            self.assertEqual(self.all_output(command).strip(), correct)
+
+    def test_broken_pipe(self):
+        stdout = StringIO()
+        stdout.write = Mock(side_effect=BrokenPipeError)
+        with patch("sys.stdout", new=stdout), \
+                patch("console.silence_stdout") as mock_silence:
+            self.assertTrue(HBNBCommand().onecmd("all Amenity"))
+        mock_silence.assert_called_once_with()
+        self.assertEqual(stdout.write.call_count, 1)
+
+    def test_stops_at_limit(self):
+        with patch.object(Amenity, "__str__", return_value="a") as mock_str:
+            self.assertEqual(self.all_output("all Amenity limit=2"),
+                             "['a', 'a']\n")
+        self.assertEqual(mock_str.call_count, 2)
+
+
+class TestQueryMethod(unittest.TestCase):
+    """Unittests for testing query and where from the HBNB command
+    interpreter."""
+
+    def setUp(self):
+        """Creates places in two cities"""
+        self.places = [Place(name=f"Le Loft {n}", city_id=f"query{n % 2}",
+                             price_by_night=50 + n * 10) for n in range(4)]
+        for place in self.places:
+            storage.new(place)
+
+    def tearDown(self):
+        """Removes the places"""
+        for place in self.places:
+            storage.delete(place)
+
+    def output(self, command):
+        """returns the output of a command"""
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(command))
+        return mock_stdout.getvalue().strip()
+
+    def test_query(self):
+        self.assertEqual(
+            self.output("query Place city_id=query1 price_by_night<100 "
+                        "order=-price_by_night fields=name,price_by_night"),
+            str([{"name": "Le Loft 3", "price_by_night": 80},
+                 {"name": "Le Loft 1", "price_by_night": 60}]))
+        self.assertEqual(
+            self.output('query Place name="Le Loft 2" max_guest=0'),
+            str([str(self.places[2])]))
+
+    def test_where(self):
+        self.assertEqual(
+            self.output('Place.where(city_id="query0", '
+                        'price_by_night>="50", fields="name")'),
+            str([{"name": "Le Loft 0"}, {"name": "Le Loft 2"}]))
+        self.assertEqual(
+            self.output("Place.where(city_id=query1, order=price_by_night, "
+                        "offset=1, limit=5, fields=name)"),
+            str([{"name": "Le Loft 3"}]))
+        self.assertEqual(self.output("Place.where(city_id=none)"), "")
+
+    def test_query_errors(self):
+        for command, correct in (
+                ("query", "** class name missing **"),
+                ("query MyModel", "** class doesn't exist **"),
+                ("query Place name~x", "** invalid predicate: name~x **"),
+                ("query Place max_guest>many",
+                 "** invalid value for max_guest: many **"),
+                ("query Place limit=x", "** invalid limit **"),
+                ("Place.where(price_by_night<1, order=name, offset=x)",
+                 "** invalid offset **")):
+            self.assertEqual(self.output(command), correct)
+
+
+class TestNearMethod(unittest.TestCase):
+    """Unittests for testing near from the HBNB command interpreter."""
+
+    def setUp(self):
+        """Creates two places far from the places of the other tests"""
+        self.close = Place(latitude=-45.03, longitude=168.66)
+        self.far = Place(latitude=-45.87, longitude=170.50)
+        for place in (self.close, self.far):
+            place.save()
+
+    def tearDown(self):
+        """Removes the places"""
+        for place in (self.close, self.far):
+            storage.delete(place)
+
+    def test_near_radius(self):
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place -45.0 168.7 10"))
+            self.assertIn(self.close.id, mock_stdout.getvalue())
+            self.assertNotIn(self.far.id, mock_stdout.getvalue())
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.near(-45.0, 168.7, 200)"))
+            output = mock_stdout.getvalue()
+            self.assertLess(output.index(self.close.id),
+                            output.index(self.far.id))
+
+    def test_near_nearest_and_box(self):
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place -45.9 170.4 nearest 1"))
+            self.assertIn(self.far.id, mock_stdout.getvalue())
+            self.assertNotIn(self.close.id, mock_stdout.getvalue())
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place box -46 168 -45 169"))
+            self.assertIn(self.close.id, mock_stdout.getvalue())
+            self.assertNotIn(self.far.id, mock_stdout.getvalue())
+
+    def test_near_errors(self):
+        for command, correct in (
+                ("near", "** class name missing **"),
+                ("near MyModel", "** class doesn't exist **"),
+                ("near User 1 2 3", "** class has no location **"),
+                ("near Place 1 2", "** location missing **"),
+                ("near Place x 2 3", "** invalid location **")):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct, mock_stdout.getvalue().strip())
+
+
+class TestExportImportMethods(unittest.TestCase):
+    """Unittests for testing export and import from the HBNB command
+    interpreter."""
+
+    def setUp(self):
+        """Creates a place to export"""
+        self.path = "test_console.jsonl"
+        self.place = Place(name="Loft")
+        self.place.save()
+
+    def tearDown(self):
+        """Removes the place and the export"""
+        storage.delete(storage.get(Place, self.place.id))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_export_import(self):
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(
+                f"export {self.path} Place"))
+            count = int(mock_stdout.getvalue())
+        storage.delete(self.place)
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            self.assertFalse(HBNBCommand().onecmd(f"import {self.path}"))
+            self.assertEqual(str(count), mock_stdout.getvalue().strip())
+        self.assertEqual(storage.get(Place, self.place.id).name, "Loft")
+
+    def test_export_import_errors(self):
+        with open(self.path, "w") as file:
+            file.write('{"__class__": "MyModel"}\n')
+        for command, correct in (
+                ("export", "** file name missing **"),
+                ("import", "** file name missing **"),
+                (f"export {self.path} MyModel", "** class doesn't exist **"),
+                ("import missing.jsonl",
+                 "** No such file or directory: missing.jsonl **"),
+                (f"import {self.path}",
+                 "** record 1: unknown class MyModel **")):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct, mock_stdout.getvalue().strip())
+
+
+class TestRunBatch(unittest.TestCase):
+    """Unittests for testing the batch mode of the HBNB command
+    interpreter."""
+
+    def run_batch(self, script):
+        """returns the result, stdout and stderr of a batch run"""
+        with patch("sys.stdout", new=StringIO()) as mock_stdout, \
+                patch("sys.stderr", new=StringIO()) as mock_stderr:
+            errors = HBNBCommand().run_batch(StringIO(script))
+        return errors, mock_stdout.getvalue(), mock_stderr.getvalue()
+
+    def test_single_flush(self):
+        with patch.object(storage, "flush",
+                          wraps=storage.flush) as mock_flush:
+            errors, out, err = self.run_batch(
+                "# two places\ncreate Place\n\nPlace.create()\n")
+        self.assertEqual(errors, 0)
+        self.assertEqual(mock_flush.call_count, 1)
+        ids = out.split()
+        self.assertEqual(len(ids), 2)
+        self.assertRegex(err, r"^2 commands, 0 errors in \d+\.\d{3} s\n$")
+        for id in ids:
+            storage.delete(storage.get(Place, id))
+
+    def test_errors(self):
+        errors, out, err = self.run_batch(
+            "create MyModel\ncount Place\nshow Place 1\n"
+            "update Place\nquit\ncreate Place\n")
+        self.assertEqual(errors, 3)
+        self.assertEqual(out, f"{storage.count('Place')}\n")
+        self.assertEqual(err.splitlines()[:3],
+                         ["line 1: ** class doesn't exist **",
+                          "line 3: ** no instance found **",
+                          "line 4: ** instance id missing **"])
+        self.assertTrue(err.splitlines()[3].startswith(
+            "5 commands, 3 errors in "))
+
+    def test_exception(self):
+        errors, out, err = self.run_batch("count\n")
+        self.assertEqual(errors, 1)
+        self.assertTrue(err.startswith("line 1: ** IndexError: "))
+
 
 class TestHBNBCommand_update(unittest.TestCase):
     """Unittests for testing update from the HBNB command interpreter."""
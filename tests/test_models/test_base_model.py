@@ -3,7 +3,7 @@
 import unittest
 from models.base_model import BaseModel
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from uuid import uuid4
 
 
@@ -130,6 +130,14 @@ class TestBaseModel(unittest.TestCase):
         self.assertIn('custom_attr', obj_dict)
         self.assertEqual(obj_dict['custom_attr'], 'custom_value')
 
+    def test_base_model_to_dict_native_dates(self):
+        """Test to_dict keeps datetimes with native_dates"""
+        obj = BaseModel()
+        obj_dict = obj.to_dict(native_dates=True)
+        self.assertEqual(obj_dict['created_at'], obj.created_at)
+        self.assertEqual(obj_dict['updated_at'], obj.updated_at)
+        self.assertEqual(BaseModel(**obj_dict).to_dict(), obj.to_dict())
+
     def test_base_model_to_dict_with_empty_attrs(self):
         """Test the to_dict method of BaseModel with empty attributes"""
         obj = BaseModel()
@@ -178,6 +186,92 @@ class TestBaseModel(unittest.TestCase):
         self.assertNotEqual(custom_datetime, obj.updated_at)
         self.assertTrue(mock_save.called)
 
+    def test_base_model_setattr_marks_dirty(self):
+        """Test attribute assignment marks the instance dirty in storage"""
+        obj = BaseModel()
+        with patch('models.storage.touch') as mock_touch:
+            obj.name = "dirty"
+        mock_touch.assert_called_once_with(obj)
+
+    def test_base_model_dates_parsed_on_read(self):
+        """Test ISO strings are kept until created_at is read"""
+        iso = '2022-01-01T12:00:00.123456'
+        obj = BaseModel(id='123', created_at=iso, updated_at=iso)
+        self.assertEqual(obj.__dict__['created_at'], iso)
+        self.assertEqual(obj.to_dict()['created_at'], iso)
+        self.assertEqual(obj.to_dict(native_dates=True)['updated_at'],
+                         datetime.fromisoformat(iso))
+        self.assertEqual(obj.created_at, datetime.fromisoformat(iso))
+        self.assertIs(obj.__dict__['created_at'], obj.created_at)
+        self.assertEqual(obj.to_dict()['created_at'], iso)
+
+    def test_base_model_dates_checked_on_read(self):
+        """Test a date spelled like isoformat() is only parsed on read"""
+        iso = '2022-13-01T12:00:00'
+        clock = type("Clock", (datetime,), {"fromisoformat": Mock()})
+        with patch('models.base_model.datetime', clock):
+            obj = BaseModel(id='123', created_at=iso)
+        clock.fromisoformat.assert_not_called()
+        with self.assertRaises(ValueError):
+            obj.created_at
+
+    def test_base_model_str_parses_dates(self):
+        """Test __str__ shows datetimes for dates given as strings"""
+        obj = BaseModel(id='123', created_at='2022-01-01T12:00:00',
+                        updated_at='2022-01-01T13:00:00')
+        self.assertIn("'created_at': datetime.datetime(2022, 1, 1, 12, 0)",
+                      str(obj))
+
+    def test_base_model_non_canonical_dates(self):
+        """Test other ISO spellings are normalized as before"""
+        for iso, expected in (('2022-01-01', '2022-01-01T00:00:00'),
+                              ('2022-01-01 12:00:00', '2022-01-01T12:00:00'),
+                              ('2022-01-01T12:00:00.000000',
+                               '2022-01-01T12:00:00'),
+                              ('2022-01-01T12:00:00+00:00',
+                               '2022-01-01T12:00:00+00:00')):
+            obj = BaseModel(created_at=iso)
+            self.assertIsInstance(obj.__dict__['created_at'], datetime)
+            self.assertEqual(obj.to_dict()['created_at'], expected)
+
+    def test_base_model_kwargs_skip_uuid_and_clock(self):
+        """Test given id and dates are not generated first"""
+        iso = '2022-01-01T12:00:00'
+        clock = type("Clock", (datetime,), {"now": Mock()})
+        with patch('models.base_model.uuid4') as mock_uuid, \
+                patch('models.base_model.datetime', clock):
+            obj = BaseModel(id='123', created_at=iso, updated_at=iso)
+        mock_uuid.assert_not_called()
+        clock.now.assert_not_called()
+        self.assertEqual(list(obj.to_dict()),
+                         ['id', 'created_at', 'updated_at', '__class__'])
+
+    def test_base_model_update(self):
+        """Test update converts, sets in place and touches once"""
+        from models.place import Place
+        place = Place()
+        place.price_by_night = 10
+        updated_at, id = place.updated_at, place.id
+        with patch('models.storage.touch') as mock_touch:
+            place.update(number_rooms="3", latitude="1.5", name=7,
+                         price_by_night="20", amenity_ids=["a"],
+                         extra="x", id="other", __class__="User")
+        mock_touch.assert_called_once_with(place)
+        self.assertEqual((place.number_rooms, place.latitude, place.name,
+                          place.price_by_night, place.amenity_ids,
+                          place.extra, place.id),
+                         (3, 1.5, "7", 20, ["a"], "x", id))
+        self.assertGreater(place.updated_at, updated_at)
+
+    def test_base_model_update_invalid(self):
+        """Test update sets nothing if a value cannot be converted"""
+        from models.place import Place
+        place = Place()
+        with self.assertRaisesRegex(ValueError,
+                                    "invalid value for max_guest: 'many'"):
+            place.update(name="Loft", max_guest="many")
+        self.assertNotIn("name", place.__dict__)
+
 
 if __name__ == "__main__":
     unittest.main()
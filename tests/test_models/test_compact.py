@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""Unit tests for the `compact` module."""
+import unittest
+from datetime import datetime
+from models.base_model import BaseModel
+from models.compact import compact, declared_fields
+from models.place import Place
+from models.user import User
+
+
+class TestCompact(unittest.TestCase):
+    """Test cases for the compact model layout."""
+
+    def test_class(self):
+        """Test the compact class keeps name, base and slots"""
+        CompactPlace = compact(Place)
+        self.assertIs(compact(Place), CompactPlace)
+        self.assertTrue(issubclass(CompactPlace, Place))
+        self.assertEqual(CompactPlace.__name__, "Place")
+        self.assertIn("city_id", CompactPlace.__slots__)
+        self.assertNotIn("indexed_attributes", CompactPlace.__slots__)
+
+    def test_declared_fields(self):
+        """Test declared fields of a model class"""
+        self.assertEqual(declared_fields(User),
+                         {"email": "", "password": "", "first_name": "",
+                          "last_name": ""})
+        self.assertEqual(declared_fields(BaseModel), {})
+
+    def test_defaults(self):
+        """Test unset declared fields read their class default"""
+        place = compact(Place)()
+        self.assertEqual(place.number_rooms, 0)
+        self.assertEqual(place.amenity_ids, [])
+        with self.assertRaises(AttributeError):
+            place.undefined
+
+    def test_same_output_as_regular(self):
+        """Test to_dict and __str__ match the regular class"""
+        place = Place()
+        place.price_by_night = 80
+        place.extra = "ad-hoc"
+        place.name = "Home"
+        for obj in (compact(Place)(**place.to_dict()), compact(Place)()):
+            if obj.id != place.id:
+                obj.id = place.id
+                obj.created_at = place.created_at
+                obj.updated_at = place.updated_at
+                obj.price_by_night = 80
+                obj.extra = "ad-hoc"
+                obj.name = "Home"
+            self.assertEqual(str(obj), str(place))
+            self.assertEqual(list(obj.to_dict().items()),
+                             list(place.to_dict().items()))
+            self.assertEqual(obj.to_dict(native_dates=True),
+                             place.to_dict(native_dates=True))
+
+    def test_same_output_as_reloaded(self):
+        """Test a regular instance built from a record, whose dates are
+        kept as strings, prints like the compact one"""
+        record = Place(name="Home").to_dict()
+        place = Place(**record)
+        obj = compact(Place)(**record)
+        self.assertIsInstance(obj.created_at, datetime)
+        self.assertEqual(obj.to_dict(), place.to_dict())
+        self.assertEqual(str(obj), str(place))
+
+    def test_update(self):
+        """Test update records new names in assignment order"""
+        place = compact(Place)()
+        place.update(number_rooms="2", extra=1)
+        self.assertEqual(place.number_rooms, 2)
+        self.assertEqual(list(place.to_dict())[-3:],
+                         ["number_rooms", "extra", "__class__"])
+
+    def test_overflow_dict(self):
+        """Test only ad-hoc attributes use __dict__"""
+        place = compact(Place)()
+        place.name = "Home"
+        self.assertEqual(place.__dict__, {})
+        place.extra = 1
+        self.assertEqual(place.__dict__, {"extra": 1})
+        del place.extra
+        self.assertNotIn("extra", place.to_dict())
+
+    def test_shared_order(self):
+        """Test instances set in the same order share one order tuple"""
+        obj1 = compact(User)()
+        obj2 = compact(User)()
+        self.assertIs(obj1._order, obj2._order)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Unit tests for the `async_storage` module."""
+import asyncio
+import json
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.place import Place
+from models.engine.async_storage import AsyncStorage
+from models.engine.file_storage import FileStorage
+
+
+class TestAsyncStorage(unittest.TestCase):
+    """Test cases for the `AsyncStorage` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.file_path = "test_async.json"
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = self.file_path
+        self.storage._FileStorage__dirty = set()
+        self.storage._FileStorage__cache = {}
+        self.astorage = AsyncStorage(self.storage)
+
+    def tearDown(self):
+        """Clean up after testing"""
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def test_asave_areload_aget(self):
+        """Test a round trip through the async API"""
+        place = Place(name="Loft")
+        self.storage.new(place)
+
+        async def round_trip():
+            await self.astorage.asave()
+            self.storage._FileStorage__objects = {}
+            self.assertIsNone(await self.astorage.aget(Place, place.id))
+            await self.astorage.areload()
+            return await self.astorage.aget("Place", place.id)
+
+        loaded = asyncio.run(round_trip())
+        self.assertEqual(loaded.to_dict(), place.to_dict())
+        with open(self.file_path) as file:
+            self.assertIn(f"Place.{place.id}", json.load(file))
+
+    def test_runs_off_the_loop(self):
+        """Test the blocking work runs on another thread"""
+        threads = []
+        flush = self.storage.flush
+
+        def record_thread():
+            threads.append(threading.current_thread())
+            flush()
+        self.storage.new(BaseModel())
+        with patch.object(self.storage, "flush", side_effect=record_thread):
+            asyncio.run(self.astorage.asave())
+            asyncio.run(self.astorage.aflush())
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_aget_lazy_off_the_loop(self):
+        """Test aget builds lazily reloaded objects on another thread"""
+        place = Place(name="Loft")
+        self.storage.new(place)
+        self.storage.flush()
+        self.storage._FileStorage__objects = {}
+        self.storage.reload(lazy=True)
+        threads = []
+        get = self.storage.get
+
+        def record_thread(*args):
+            threads.append(threading.current_thread())
+            return get(*args)
+
+        async def twice():
+            first = await self.astorage.aget(Place, place.id)
+            return first, await self.astorage.aget(Place, place.id)
+
+        with patch.object(self.storage, "get", side_effect=record_thread):
+            first, second = asyncio.run(twice())
+        self.assertIs(first, second)
+        self.assertEqual(first.name, "Loft")
+        self.assertNotIn(threading.current_thread(), threads[:1])
+        self.assertEqual(threads[1:], [threading.current_thread()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Unit tests for the `atomic_file` module."""
+import os
+import unittest
+from models.engine.atomic_file import atomic_open, generation_paths
+
+
+class TestAtomicOpen(unittest.TestCase):
+    """Test cases for the `atomic_open` function."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.path = "test_atomic.json"
+
+    def tearDown(self):
+        """Clean up after testing"""
+        for path in generation_paths(self.path, 3):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read(self, path):
+        """returns the content of path"""
+        with open(path) as file:
+            return file.read()
+
+    def test_replace(self):
+        """Test the file is replaced and no temporary file is left"""
+        with atomic_open(self.path) as file:
+            file.write("first")
+        with atomic_open(self.path) as file:
+            file.write("second")
+        self.assertEqual(self.read(self.path), "second")
+        self.assertEqual([name for name in os.listdir(".")
+                          if name.startswith(self.path + ".tmp")], [])
+
+    def test_error_keeps_previous_file(self):
+        """Test a failing write leaves the previous content in place"""
+        with atomic_open(self.path) as file:
+            file.write("first")
+        with self.assertRaises(RuntimeError):
+            with atomic_open(self.path) as file:
+                file.write("half")
+                raise RuntimeError("crash")
+        self.assertEqual(self.read(self.path), "first")
+        self.assertFalse(os.path.exists(f"{self.path}.tmp{os.getpid()}"))
+
+    def test_binary(self):
+        """Test binary mode"""
+        with atomic_open(self.path, binary=True) as file:
+            file.write(b"\x00\x01")
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), b"\x00\x01")
+
+    def test_generations(self):
+        """Test previous versions are rotated and the oldest dropped"""
+        for content in ("1", "2", "3", "4"):
+            with atomic_open(self.path, generations=2) as file:
+                file.write(content)
+        self.assertEqual(self.read(self.path), "4")
+        self.assertEqual(self.read(self.path + ".1"), "3")
+        self.assertEqual(self.read(self.path + ".2"), "2")
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_generation_paths(self):
+        """Test generation path names"""
+        self.assertEqual(generation_paths("f.json", 2),
+                         ["f.json", "f.json.1", "f.json.2"])
+        self.assertEqual(generation_paths("f.json", 0), ["f.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Unit tests for the `columns` module."""
+import unittest
+from unittest.mock import patch
+from models.engine import columns as columns_module
+from models.engine.columns import Columns
+
+
+class TestColumns(unittest.TestCase):
+    """Test cases for the `Columns` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.columns = Columns("Place", ("price_by_night", "max_guest"),
+                               batch_size=2)
+        self.columns.set("Place.1", (50, 2))
+        self.columns.set("Place.2", (90, 4))
+        self.columns.set("Place.3", (150, 6))
+        self.columns.set("Place.4", ("n/a", 4))
+
+    def select(self, *predicates):
+        """runs select with and without NumPy"""
+        results = [self.columns.select(predicates)]
+        with patch.object(columns_module, "numpy", None):
+            results.append(self.columns.select(predicates))
+        self.assertEqual(results[0], results[-1])
+        return results[0]
+
+    def test_select(self):
+        """Test predicates are combined with and"""
+        self.assertEqual(self.select(("price_by_night", "<", 100),
+                                     ("max_guest", ">=", 4)),
+                         ["Place.2"])
+        self.assertEqual(self.select(("max_guest", "==", 4)),
+                         ["Place.2", "Place.4"])
+        self.assertEqual(self.select(("price_by_night", ">", 1000)), [])
+        self.assertEqual(len(self.select()), 4)
+
+    def test_not_a_number(self):
+        """Test values that are not numbers match no comparison"""
+        self.assertEqual(self.select(("price_by_night", ">=", 0)),
+                         ["Place.1", "Place.2", "Place.3"])
+
+    def test_not_a_number_differs(self):
+        """Test values that are not numbers do not match !="""
+        self.assertEqual(self.select(("price_by_night", "!=", 5)),
+                         ["Place.1", "Place.2", "Place.3"])
+
+    @unittest.skipUnless(columns_module.numpy, "NumPy is not installed")
+    def test_numpy(self):
+        """Test the NumPy path gives the rows of the pure Python one"""
+        columns = Columns("Place", ("price_by_night",))
+        for n in range(1000):
+            columns.set(f"Place.{n}", (n % 7 if n % 5 else None,))
+        for op in ("<", "<=", ">", ">=", "==", "!="):
+            predicates = [("price_by_night", op, 3)]
+            with patch.object(columns_module, "numpy", None):
+                expected = columns.select(predicates)
+            self.assertEqual(columns.select(predicates), expected)
+
+    def test_update_and_remove(self):
+        """Test rows follow updates and removed rows are reused"""
+        self.columns.set("Place.1", (95, 4))
+        self.assertEqual(self.select(("price_by_night", "<", 100),
+                                     ("max_guest", "==", 4)),
+                         ["Place.1", "Place.2"])
+        self.columns.remove("Place.2")
+        self.columns.remove("Place.2")
+        self.assertEqual(len(self.columns), 3)
+        self.assertEqual(self.select(("max_guest", "!=", 0)),
+                         ["Place.1", "Place.3", "Place.4"])
+        self.columns.set("Place.5", (10, 1))
+        self.assertEqual(self.select(("price_by_night", "==", 10)),
+                         ["Place.5"])
+        self.assertEqual(self.columns.get("Place.5"),
+                         {"price_by_night": 10.0, "max_guest": 1.0})
+
+    def test_invalid(self):
+        """Test unknown attributes and operators"""
+        with self.assertRaises(ValueError):
+            self.columns.select([("name", "==", 1)])
+        with self.assertRaises(ValueError):
+            self.columns.select([("max_guest", "~", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
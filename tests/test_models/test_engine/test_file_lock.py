@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Unit tests for the `file_lock` module."""
+import fcntl
+import os
+import unittest
+from models.engine.file_lock import FileLock, stamp
+
+
+class TestFileLock(unittest.TestCase):
+    """Test cases for the `FileLock` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.path = "test_lock.json"
+        self.lock = FileLock(self.path)
+
+    def tearDown(self):
+        """Clean up after testing"""
+        for path in (self.path, self.lock.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def try_lock(self, operation):
+        """returns True if operation can be taken on the lock file now"""
+        with open(self.lock.path, "a") as file:
+            try:
+                fcntl.flock(file.fileno(), operation | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+
+    def test_exclusive(self):
+        """Test an exclusive lock blocks every other lock"""
+        with self.lock.exclusive():
+            self.assertFalse(self.try_lock(fcntl.LOCK_SH))
+            self.assertFalse(self.try_lock(fcntl.LOCK_EX))
+        self.assertTrue(self.try_lock(fcntl.LOCK_EX))
+
+    def test_shared(self):
+        """Test a shared lock only blocks writers"""
+        with self.lock.shared():
+            self.assertTrue(self.try_lock(fcntl.LOCK_SH))
+            self.assertFalse(self.try_lock(fcntl.LOCK_EX))
+
+    def test_generation(self):
+        """Test the generation counter survives reopening the lock"""
+        with self.lock.exclusive() as file:
+            self.assertEqual(self.lock.generation(file), 0)
+            self.assertEqual(self.lock.bump(file), 1)
+        with self.lock.shared() as file:
+            self.assertEqual(self.lock.generation(file), 1)
+        with self.lock.exclusive() as file:
+            self.assertEqual(self.lock.bump(file), 2)
+
+    def test_stamp(self):
+        """Test the stamp changes with the generation and the file"""
+        self.assertIsNone(stamp(self.path, 1))
+        with open(self.path, "w") as file:
+            file.write("{}")
+        first = stamp(self.path, 1)
+        self.assertEqual(first, stamp(self.path, 1))
+        self.assertNotEqual(first, stamp(self.path, 2))
+        with open(self.path, "w") as file:
+            file.write("{ }")
+        self.assertNotEqual(first, stamp(self.path, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,24 @@
 import unittest
 import os
 import json
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import threading
+from io import StringIO
+from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
+from models.compact import CompactModel
+from models.user import User
+from models.city import City
+from models.place import Place
+from models.review import Review
 from models.engine.file_storage import FileStorage
+from models.engine import columns as columns_module
+from models.engine.atomic_file import atomic_open
+from models.engine.formats import JSONFormat
 
 
 class TestFileStorage(unittest.TestCase):
@@ -14,12 +30,16 @@ class TestFileStorage(unittest.TestCase):
         self.storage = FileStorage()
         self.storage._FileStorage__objects = {}
         self.storage._FileStorage__file_path = self.file_path
+        self.storage._FileStorage__dirty = set()
+        self.storage._FileStorage__cache = {}
 
     def tearDown(self):
         """Clean up after testing"""
         self.storage._FileStorage__objects = {}
-        if os.path.exists(self.file_path):
-            os.remove(self.file_path)
+        for path in (self.file_path, self.file_path + ".log",
+                     self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_all_empty(self):
         """Test all method with an empty storage"""
@@ -60,6 +80,940 @@ class TestFileStorage(unittest.TestCase):
         self.storage._FileStorage__objects = {}
         self.storage.reload()  # This should not raise an exception
 
+    def test_delete(self):
+        """Test delete method"""
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.delete(obj1)
+        self.assertEqual(len(self.storage.all()), 0)
+        self.storage.delete(None)
+
+    def test_journal_save_and_reload(self):
+        """Test journaled save appends records instead of rewriting"""
+        self.storage.enable_journal()
+        journal = self.storage._FileStorage__journal
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.storage.save()
+        self.storage.delete(obj1)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.file_path))
+        with open(journal.log_path) as file:
+            self.assertEqual(len(file.readlines()), 3)
+
+        self.storage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all()),
+                         [f"BaseModel.{obj2.id}"])
+
+    def test_journal_failed_append(self):
+        """Test the changes of a failed append are written by the retry"""
+        self.storage.enable_journal()
+        journal = self.storage._FileStorage__journal
+        obj = BaseModel()
+        self.storage.new(obj)
+        with patch.object(journal, "append", side_effect=OSError(28, "")):
+            with self.assertRaises(OSError):
+                self.storage.flush()
+        self.assertEqual(self.storage.dirty_count(), 1)
+        self.storage.flush()
+        self.assertEqual(list(journal.read()), [f"BaseModel.{obj.id}"])
+
+    def test_new_same_object_keeps_snapshot(self):
+        """Test adding a stored object again does not copy all() again"""
+        obj = BaseModel()
+        self.storage.new(obj)
+        snapshot = self.storage.all()
+        self.storage.new(obj)
+        self.assertIs(self.storage.all(), snapshot)
+        other = BaseModel(id=obj.id)
+        self.storage.new(other)
+        self.assertIsNot(self.storage.all(), snapshot)
+        self.assertIs(self.storage.all()[f"BaseModel.{obj.id}"], other)
+
+    def test_dirty_tracking(self):
+        """Test new, touch, delete and save maintain the dirty count"""
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.assertEqual(self.storage.dirty_count(), 2)
+        self.storage.save()
+        self.assertEqual(self.storage.dirty_count(), 0)
+        self.storage.touch(obj1)
+        self.storage.touch(obj1)
+        self.assertEqual(self.storage.dirty_count(), 1)
+        self.storage.delete(obj2)
+        self.assertEqual(self.storage.dirty_count(), 2)
+        self.storage.save()
+        self.assertEqual(self.storage.dirty_count(), 0)
+
+    def test_save_reuses_clean_objects(self):
+        """Test save only calls to_dict on dirty objects"""
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.storage.save()
+        obj1.name = "changed"
+        self.storage.touch(obj1)
+        with patch.object(BaseModel, "to_dict",
+                          autospec=True,
+                          side_effect=lambda o: {"id": o.id}) as to_dict:
+            self.storage.save()
+        self.assertEqual(to_dict.call_count, 1)
+        with open(self.file_path) as file:
+            saved = json.load(file)
+        self.assertEqual(saved[f"BaseModel.{obj1.id}"], {"id": obj1.id})
+        self.assertEqual(saved[f"BaseModel.{obj2.id}"], obj2.to_dict())
+
+    def test_save_output_matches_json_dump(self):
+        """Test the cached encoding writes the same document as json.dump"""
+        obj1 = BaseModel()
+        obj1.name = "My First Model"
+        self.storage.new(obj1)
+        self.storage.save()
+        with open(self.file_path) as file:
+            content = file.read()
+        self.assertEqual(content, json.dumps(
+            {f"BaseModel.{obj1.id}": obj1.to_dict()}))
+
+    def test_get(self):
+        """Test get method"""
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        self.assertIs(self.storage.get(BaseModel, obj1.id), obj1)
+        self.assertIs(self.storage.get("BaseModel", obj1.id), obj1)
+        self.assertIsNone(self.storage.get("BaseModel", "missing"))
+
+    def test_lazy_reload(self):
+        """Test lazy reload only builds instances when accessed"""
+        obj1 = BaseModel()
+        obj2 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.storage.save()
+
+        self.storage._FileStorage__objects = {}
+        self.storage.reload(lazy=True)
+        objects = self.storage.all()
+        key1 = f"BaseModel.{obj1.id}"
+        key2 = f"BaseModel.{obj2.id}"
+        self.assertEqual(len(objects), 2)
+        self.assertFalse(objects.is_loaded(key1))
+        self.assertEqual(self.storage.get(BaseModel, obj1.id).to_dict(),
+                         obj1.to_dict())
+        self.assertTrue(objects.is_loaded(key1))
+        self.assertFalse(objects.is_loaded(key2))
+        self.assertEqual(self.storage.dirty_count(), 0)
+
+        self.storage.save()
+        self.assertFalse(objects.is_loaded(key2))
+        with open(self.file_path) as file:
+            self.assertEqual(json.load(file)[key2], obj2.to_dict())
+
+    def test_scan(self):
+        """Test scan pages through a lazy reload building as it goes"""
+        users = [User() for _ in range(3)]
+        for obj in [BaseModel()] + users:
+            self.storage.new(obj)
+        self.storage.save()
+
+        self.storage._FileStorage__objects = {}
+        self.storage.reload(lazy=True)
+        objects = self.storage.scan(User, after=f"User.{users[0].id}")
+        snapshot = self.storage.all()
+        self.assertEqual(next(objects).to_dict(), users[1].to_dict())
+        self.assertTrue(snapshot.is_loaded(f"User.{users[1].id}"))
+        self.assertFalse(snapshot.is_loaded(f"User.{users[2].id}"))
+        self.assertEqual([obj.id for obj in objects], [users[2].id])
+        self.assertEqual(len(list(self.storage.scan())), 4)
+        for after in ("User.missing", next(iter(snapshot))):
+            with self.assertRaises(KeyError):
+                self.storage.scan(User, after=after)
+
+    def test_scan_reads_live_objects(self):
+        """Test scan(cls) after a write does not copy the objects"""
+        users = [User(id=str(n)) for n in range(4)]
+        for user in users:
+            self.storage.new(user)
+        held = self.storage.all()
+        self.storage.delete(users[2])
+        with patch.object(FileStorage, "_FileStorage__current_snapshot",
+                          side_effect=AssertionError):
+            objects = self.storage.scan(User, after="User.0")
+            self.storage.new(User(id="4"))
+            self.assertEqual([user.id for user in objects], ["1", "3"])
+        self.assertEqual(len(held), 4)
+
+    def test_all_and_count_by_class(self):
+        """Test class filtered all and count"""
+        obj1 = BaseModel()
+        obj2 = User()
+        self.storage.new(obj1)
+        self.storage.new(obj2)
+        self.assertEqual(self.storage.all(User),
+                         {f"User.{obj2.id}": obj2})
+        self.assertEqual(list(self.storage.all("BaseModel").values()),
+                         [obj1])
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertEqual(self.storage.count("Place"), 0)
+        self.storage.delete(obj2)
+        self.assertEqual(self.storage.all(User), {})
+        self.assertEqual(self.storage.count("User"), 0)
+
+    def test_count_exact_class_name(self):
+        """Test classes sharing a name prefix are counted apart"""
+        objects = self.storage._FileStorage__objects
+        objects["User.1"] = User(id="1")
+        objects["UserProfile.1"] = BaseModel(id="1")
+        self.assertEqual(self.storage.count("User"), 1)
+        self.assertEqual(list(self.storage.all("User")), ["User.1"])
+
+    def test_lookup_indexed_attribute(self):
+        """Test lookup on foreign keys follows new, update and delete"""
+        city1 = City()
+        city2 = City()
+        city1.state_id = "s1"
+        city2.state_id = "s1"
+        self.storage.new(city1)
+        self.storage.new(city2)
+        self.assertEqual(set(self.storage.lookup(City, state_id="s1")),
+                         {f"City.{city1.id}", f"City.{city2.id}"})
+
+        city2.state_id = "s2"
+        self.storage.touch(city2)
+        self.assertEqual(list(self.storage.lookup("City", state_id="s1")),
+                         [f"City.{city1.id}"])
+        self.assertEqual(list(self.storage.lookup("City", state_id="s2")),
+                         [f"City.{city2.id}"])
+
+        self.storage.delete(city1)
+        self.assertEqual(self.storage.lookup(City, state_id="s1"), {})
+
+    def test_lookup_mixed_attributes(self):
+        """Test lookup combines indexed and plain attributes"""
+        review1 = Review(id="1", place_id="p1", user_id="u1", text="ok")
+        review2 = Review(id="2", place_id="p1", user_id="u2", text="ok")
+        review3 = Review(id="3", place_id="p2", user_id="u1", text="ok")
+        for review in (review1, review2, review3):
+            self.storage.new(review)
+        self.assertEqual(
+            self.storage.lookup(Review, place_id="p1", user_id="u1"),
+            {"Review.1": review1})
+        self.assertEqual(
+            list(self.storage.lookup(Review, user_id="u1", text="ok")),
+            ["Review.1", "Review.3"])
+        self.assertEqual(len(self.storage.lookup(Review, text="ok")), 3)
+        self.assertEqual(self.storage.lookup(Review, text="ko"), {})
+
+    def test_lookup_after_reload(self):
+        """Test indexes are filled by both eager and lazy reload"""
+        place = Place()
+        place.city_id = "c1"
+        self.storage.new(place)
+        self.storage.save()
+        for lazy in (False, True):
+            self.storage._FileStorage__objects = {}
+            self.storage.reload(lazy=lazy)
+            self.assertEqual(list(self.storage.lookup(Place, city_id="c1")),
+                             [f"Place.{place.id}"])
+
+    def test_binary_format_save_and_reload(self):
+        """Test save and reload in the binary format"""
+        bin_path = "test_file.bin"
+        self.storage.set_format("binary", bin_path)
+        self.addCleanup(os.remove, bin_path)
+        obj1 = Place()
+        obj1.price_by_night = 80
+        self.storage.new(obj1)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.file_path))
+
+        for lazy in (False, True):
+            self.storage._FileStorage__objects = {}
+            self.storage.reload(lazy=lazy)
+            obj = self.storage.get(Place, obj1.id)
+            self.assertEqual(obj.to_dict(), obj1.to_dict())
+            self.assertEqual(obj.created_at, obj1.created_at)
+
+    def test_journal_only_json(self):
+        """Test the journal refuses a format other than json"""
+        self.storage.set_format("binary", "test_file.bin")
+        self.assertRaises(ValueError, self.storage.enable_journal)
+        self.storage.set_format("json", self.file_path)
+        self.storage.enable_journal()
+        self.assertRaises(ValueError, self.storage.set_format, "binary")
+        self.assertEqual(self.storage._FileStorage__journal.snapshot_path,
+                         self.file_path)
+
+    def test_save_is_atomic(self):
+        """Test a failing save leaves the previous file intact"""
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.save()
+        with open(self.file_path) as file:
+            before = file.read()
+
+        def crash(file, entries):
+            file.write("{")
+            raise RuntimeError("killed during save")
+
+        self.storage.new(BaseModel())
+        with patch.object(JSONFormat, "write", side_effect=crash):
+            with self.assertRaises(RuntimeError):
+                self.storage.save()
+        with open(self.file_path) as file:
+            self.assertEqual(file.read(), before)
+
+    def test_reload_falls_back_to_previous_generation(self):
+        """Test reload uses the newest readable generation"""
+        self.storage.keep_generations(1)
+        self.addCleanup(os.remove, self.file_path + ".1")
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        self.storage.save()
+        self.storage.save()
+        with open(self.file_path, "w") as file:
+            file.write('{"BaseModel.')
+
+        self.storage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all()), [f"BaseModel.{obj1.id}"])
+
+    def test_transaction_flushes_once(self):
+        """Test saves inside a transaction are written once on exit"""
+        with patch.object(FileStorage, "flush") as mock_flush:
+            with self.storage.transaction():
+                for _ in range(3):
+                    self.storage.new(BaseModel())
+                    self.storage.save()
+                with self.storage.transaction():
+                    self.storage.save()
+                self.assertFalse(mock_flush.called)
+                self.assertEqual(self.storage.pending_saves(), 4)
+        self.assertEqual(mock_flush.call_count, 1)
+
+    def test_transaction_writes_file(self):
+        """Test the transaction flush writes every object"""
+        with self.storage.transaction():
+            for _ in range(3):
+                self.storage.new(BaseModel())
+                self.storage.save()
+            self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(self.storage.pending_saves(), 0)
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 3)
+
+    def test_transaction_flushes_on_error(self):
+        """Test an error inside the block still flushes pending saves"""
+        with self.assertRaises(RuntimeError):
+            with self.storage.transaction():
+                self.storage.new(BaseModel())
+                self.storage.save()
+                raise RuntimeError
+        self.assertTrue(os.path.exists(self.file_path))
+
+    def test_transaction_other_thread(self):
+        """Test a transaction only defers the saves of its own thread"""
+        with self.storage.transaction():
+            self.storage.new(BaseModel())
+            self.storage.save()
+            thread = threading.Thread(target=self.storage.save)
+            thread.start()
+            thread.join()
+            self.assertEqual(self.storage.pending_saves(), 0)
+            with open(self.file_path) as file:
+                self.assertEqual(len(json.load(file)), 1)
+
+    def test_autoflush_count(self):
+        """Test the count policy writes every count saves"""
+        self.storage.set_autoflush(count=3)
+        pending = []
+        for _ in range(7):
+            self.storage.save()
+            pending.append(self.storage.pending_saves())
+        self.assertEqual(pending, [1, 2, 0, 1, 2, 0, 1])
+        self.storage.flush()
+
+    def test_autoflush_seconds(self):
+        """Test the time policy writes once the last flush is old enough"""
+        self.storage.set_autoflush(seconds=60)
+        with patch("models.engine.file_storage.monotonic") as mock_time:
+            mock_time.return_value = self.storage._FileStorage__last_flush
+            self.storage.save()
+            self.assertEqual(self.storage.pending_saves(), 1)
+            mock_time.return_value += 61
+            self.storage.save()
+            self.assertEqual(self.storage.pending_saves(), 0)
+
+    def test_autoflush_seconds_timer(self):
+        """Test a deferred save is written when the seconds pass idle"""
+        self.storage.set_autoflush(seconds=0.1)
+        self.storage.new(BaseModel())
+        self.storage.save()
+        self.assertEqual(self.storage.pending_saves(), 1)
+        for _ in range(100):
+            if os.path.exists(self.file_path):
+                break
+            sleep(0.02)
+        self.assertEqual(self.storage.pending_saves(), 0)
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 1)
+
+    def test_reload_compact_classes(self):
+        """Test reload builds compact instances once enabled"""
+        place = Place()
+        place.name = "Home"
+        self.storage.new(place)
+        self.storage.save()
+        self.storage.use_compact_classes()
+        for lazy in (False, True):
+            self.storage._FileStorage__objects = {}
+            self.storage.reload(lazy=lazy)
+            obj = self.storage.get(Place, place.id)
+            self.assertIsInstance(obj, CompactModel)
+            self.assertIsInstance(obj, Place)
+            self.assertEqual(str(obj), str(place))
+
+    def test_select_columns(self):
+        """Test select follows new, updates and delete"""
+        cheap = Place(id="1", price_by_night=80, max_guest=4)
+        small = Place(id="2", price_by_night=60, max_guest=2)
+        for place in (cheap, small):
+            self.storage.new(place)
+        predicates = (("price_by_night", "<", 100), ("max_guest", ">=", 4))
+        self.assertEqual(self.storage.select(Place, *predicates),
+                         {"Place.1": cheap})
+
+        small.max_guest = 5
+        self.storage.touch(small)
+        self.assertEqual(list(self.storage.select("Place", *predicates)),
+                         ["Place.1", "Place.2"])
+        self.storage.delete(cheap)
+        self.assertEqual(list(self.storage.select(Place, *predicates)),
+                         ["Place.2"])
+        with self.assertRaises(ValueError):
+            self.storage.select(User, ("email", "==", 1))
+
+    def test_query_plans(self):
+        """Test every plan gives the results a scan would"""
+        places = [Place(id=str(n), city_id=f"c{n % 3}", name=f"n{n % 2}",
+                        price_by_night=40 + n * 10) for n in range(9)]
+        places[4].price_by_night = "90"
+        for place in places:
+            self.storage.new(place)
+        columns = "columns price_by_night" if columns_module.numpy else "scan"
+        for predicates, plan, ids in (
+                ((("city_id", "==", "c1"), ("price_by_night", "<", 100)),
+                 "index city_id", ["1"]),
+                ((("price_by_night", ">=", 60), ("price_by_night", "!=", 90)),
+                 columns, ["2", "3", "6", "7", "8"]),
+                ((("price_by_night", "!=", 90),), "scan",
+                 ["0", "1", "2", "3", "4", "6", "7", "8"]),
+                ((("name", "==", "n1"),), "scan", ["1", "3", "5", "7"])):
+            self.assertEqual(self.storage.explain(Place, *predicates), plan)
+            self.assertEqual(sorted(place.id for place in
+                                    self.storage.query(Place, *predicates)),
+                             ids)
+        self.assertEqual(
+            list(self.storage.query("Place", ("city_id", "==", "c2"),
+                                    fields=["id", "name"],
+                                    order=["-price_by_night"], limit=2)),
+            [{"id": "8", "name": "n0"}, {"id": "5", "name": "n1"}])
+        with self.assertRaises(ValueError):
+            self.storage.query(Place, ("name", "~", "n"))
+        with self.assertRaises(ValueError):
+            self.storage.query(Place, order=["price_by_night"])
+
+    def test_query_reads_live_objects(self):
+        """Test query() after a write does not copy the objects"""
+        places = [Place(id=str(n), city_id=f"c{n % 2}") for n in range(4)]
+        for place in places:
+            self.storage.new(place)
+        held = self.storage.all()
+        self.storage.new(Place(id="4", city_id="c0"))
+        self.storage.delete(places[2])
+        with patch.object(FileStorage, "_FileStorage__current_snapshot",
+                          side_effect=AssertionError) as snapshot:
+            self.assertEqual(
+                [place.id for place in self.storage.query(
+                    Place, ("city_id", "==", "c0"))], ["0", "4"])
+            self.assertEqual(
+                [place.id for place in self.storage.query(
+                    Place, ("id", ">", "0"), limit=2)], ["1", "3"])
+        snapshot.assert_not_called()
+        self.assertEqual(len(held), 4)
+
+    def test_query_lazy_scan(self):
+        """Test a scan only builds matching records and stops at limit"""
+        users = [User(email=f"{n % 2}@mail.com") for n in range(6)]
+        for obj in users:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage._FileStorage__objects = {}
+        self.storage.reload(lazy=True)
+        results = self.storage.query(User, ("email", "==", "1@mail.com"),
+                                     limit=2)
+        self.assertEqual([obj.id for obj in results],
+                         [users[1].id, users[3].id])
+        snapshot = self.storage.all()
+        self.assertEqual([snapshot.is_loaded(f"User.{obj.id}")
+                          for obj in users],
+                         [False, True, False, True, False, False])
+
+    def test_spatial_queries(self):
+        """Test near, nearest and within follow new, updates and delete"""
+        louvre = Place(id="1", latitude=48.8606, longitude=2.3376)
+        orsay = Place(id="2", latitude=48.8600, longitude=2.3266)
+        lyon = Place(id="3", latitude=45.7640, longitude=4.8357)
+        for place in (lyon, orsay, louvre):
+            self.storage.new(place)
+        self.assertEqual(list(self.storage.near(Place, 48.861, 2.336, 5)),
+                         ["Place.1", "Place.2"])
+        self.assertEqual(list(self.storage.nearest("Place", 45, 5, 2)),
+                         ["Place.3", "Place.1"])
+        self.assertEqual(self.storage.within(Place, 45, 4, 46, 5),
+                         {"Place.3": lyon})
+
+        lyon.latitude, lyon.longitude = 48.8530, 2.3499
+        self.storage.touch(lyon)
+        self.assertEqual(len(self.storage.near(Place, 48.861, 2.336, 5)), 3)
+        self.storage.delete(louvre)
+        self.assertEqual(list(self.storage.nearest(Place, 48.861, 2.336)),
+                         ["Place.2"])
+        with self.assertRaises(ValueError):
+            self.storage.near(User, 0, 0, 1)
+
+    def shared_storage(self):
+        """returns another storage of the same file, as a second process
+        would have"""
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = self.file_path
+        storage._FileStorage__dirty = set()
+        storage._FileStorage__cache = {}
+        storage.enable_sharing()
+        storage.reload()
+        return storage
+
+    def test_sharing_merges_per_key(self):
+        """Test each storage keeps the changes of the other one"""
+        first = self.storage
+        first.enable_sharing()
+        second = self.shared_storage()
+        place = Place(id="1", name="first")
+        first.new(place)
+        first.save()
+        self.assertTrue(second.refresh())
+        self.assertFalse(second.refresh())
+        self.assertEqual(second.get(Place, "1").name, "first")
+
+        copy = second.get(Place, "1")
+        copy.name = "second"
+        second.new(copy)
+        second.save()
+        first.new(User(id="2"))
+        first.save()
+        self.assertEqual(first.get(Place, "1").name, "second")
+        self.assertEqual(first.lookup(Place, name="second"),
+                         {"Place.1": first.get(Place, "1")})
+        self.assertTrue(second.refresh())
+        self.assertEqual(sorted(second.all()), ["Place.1", "User.2"])
+
+        second.delete(second.get(User, "2"))
+        second.save()
+        first.reload()
+        self.assertEqual(list(first.all()), ["Place.1"])
+        with open(self.file_path) as file:
+            self.assertEqual(list(json.load(file)), ["Place.1"])
+
+    def test_sharing_merge_encodes_once(self):
+        """Test a merge keeps unchanged objects, encoding each record
+        of the file once"""
+        self.storage.enable_sharing()
+        second = self.shared_storage()
+        for n in range(3):
+            self.storage.new(User(id=str(n)))
+        self.storage.save()
+        second.refresh()
+        kept = second.get(User, "0")
+        second.new(User(id="3"))
+        with patch.object(JSONFormat, "encode", autospec=True,
+                          side_effect=JSONFormat.encode) as encode:
+            second.save()
+        # the new user, then the 3 records of the unchanged file
+        self.assertEqual(encode.call_count, 1)
+        user = self.storage.get(User, "1")
+        user.first_name = "Betty"
+        self.storage.new(user)
+        self.storage.save()
+        with patch.object(JSONFormat, "encode", autospec=True,
+                          side_effect=JSONFormat.encode) as encode:
+            second.refresh()
+        self.assertEqual(encode.call_count, 4)
+        self.assertIs(second.get(User, "0"), kept)
+        self.assertEqual(second.get(User, "1").first_name, "Betty")
+
+    def test_sharing_failed_write_keeps_changes(self):
+        """Test edits of a failed write survive the next merge"""
+        self.storage.enable_sharing()
+        second = self.shared_storage()
+        self.storage.new(Place(id="1", name="first"))
+        self.storage.save()
+        second.refresh()
+        place = second.get(Place, "1")
+        place.name = "second"
+        second.new(place)
+        with patch("models.engine.file_storage.atomic_open",
+                   side_effect=OSError(28, "")):
+            with self.assertRaises(OSError):
+                second.flush()
+        self.storage.new(User(id="2"))
+        self.storage.save()
+        second.flush()
+        self.assertEqual(second.get(Place, "1").name, "second")
+        self.storage.refresh()
+        self.assertEqual(self.storage.get(Place, "1").name, "second")
+
+    def test_sharing_not_combined_with_journal(self):
+        """Test sharing and the journal refuse each other"""
+        self.storage.enable_journal()
+        self.assertRaises(ValueError, self.storage.enable_sharing)
+        self.assertRaises(ValueError, self.shared_storage().enable_journal)
+
+    def test_sharing_processes(self):
+        """Test no save is lost when processes write at the same time"""
+        self.storage.enable_sharing()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_save_from_process,
+                                   args=(self.file_path, f"{n}-", 20))
+                   for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.storage.reload()
+        self.assertEqual(self.storage.count(BaseModel), 80)
+
+    def test_all_snapshot(self):
+        """Test all() keeps returning the same copy until a change"""
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        snapshot = self.storage.all()
+        self.assertIs(self.storage.all(), snapshot)
+        self.assertIs(self.storage.all(BaseModel),
+                      self.storage.all("BaseModel"))
+        obj2 = BaseModel()
+        self.storage.new(obj2)
+        self.assertEqual(list(snapshot), [f"BaseModel.{obj1.id}"])
+        self.assertEqual(len(self.storage.all()), 2)
+        self.assertEqual(len(self.storage.all(BaseModel)), 2)
+        self.storage.delete(obj1)
+        self.assertEqual(list(self.storage.all(BaseModel)),
+                         [f"BaseModel.{obj2.id}"])
+
+    def test_all_by_class_lazy(self):
+        """Test all(cls) after a lazy reload only builds what is read"""
+        places = [Place() for _ in range(10)]
+        for place in places:
+            self.storage.new(place)
+        self.storage.save()
+        self.storage._FileStorage__objects = {}
+        self.storage.reload(lazy=True)
+        objects = self.storage.all("Place")
+        key = f"Place.{places[0].id}"
+        self.assertFalse(any(objects.is_loaded(k) for k in objects))
+        self.assertIs(objects[key], self.storage.all()[key])
+        self.assertEqual(sum(objects.is_loaded(k) for k in objects), 1)
+        self.storage.export_jsonl(StringIO(), Place)
+        self.assertEqual(sum(objects.is_loaded(k) for k in objects), 1)
+
+    def test_all_read_only(self):
+        """Test changing all() raises instead of being ignored"""
+        obj = User(id="1")
+        self.storage.new(obj)
+        for objects in (self.storage.all(), self.storage.all(User)):
+            with self.assertRaises(TypeError):
+                del objects["User.1"]
+            with self.assertRaises(TypeError):
+                objects["User.2"] = obj
+        self.assertEqual(self.storage.count(User), 1)
+
+    def test_all_snapshot_patched_in_place(self):
+        """Test writes update a snapshot no reader holds instead of
+        copying the objects on the next all()"""
+        obj1 = BaseModel()
+        self.storage.new(obj1)
+        snapshot_id = id(self.storage.all())
+        view_id = id(self.storage.all(BaseModel))
+        obj2 = BaseModel()
+        self.storage.new(obj2)
+        self.storage.delete(obj1)
+        self.assertEqual(id(self.storage.all()), snapshot_id)
+        self.assertEqual(id(self.storage.all(BaseModel)), view_id)
+        self.assertEqual(list(self.storage.all(BaseModel)),
+                         [f"BaseModel.{obj2.id}"])
+
+    def test_threads(self):
+        """Test saves, reads and writes from several threads at once"""
+        errors = []
+
+        def create(prefix):
+            try:
+                for n in range(200):
+                    self.storage.new(Place(id=f"{prefix}{n}", latitude=n))
+                    if n % 20 == 0:
+                        self.storage.save()
+            except Exception as error:
+                errors.append(error)
+
+        def read():
+            try:
+                while any(thread.is_alive() for thread in writers):
+                    for obj in self.storage.all().values():
+                        str(obj)
+                    self.storage.lookup(Place, user_id="")
+                    self.storage.all(Place)
+            except Exception as error:
+                errors.append(error)
+
+        writers = [threading.Thread(target=create, args=(f"{n}-",))
+                   for n in range(4)]
+        readers = [threading.Thread(target=read) for n in range(2)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers + readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.storage.save()
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 800)
+        self.assertEqual(self.storage.count(Place), 800)
+        self.assertEqual(len(self.storage.select(
+            Place, ("latitude", ">=", 100))), 400)
+
+    def test_background_flusher(self):
+        """Test saves are written by the flusher and close is a barrier"""
+        self.storage.start_flusher()
+        self.addCleanup(self.storage.close)
+        objs = [BaseModel() for _ in range(50)]
+        flush = self.storage.flush
+        threads = []
+
+        def record_thread():
+            threads.append(threading.current_thread())
+            flush()
+        with patch.object(self.storage, "flush", side_effect=record_thread):
+            for obj in objs:
+                self.storage.new(obj)
+                self.storage.save()
+            self.storage.close()
+        self.assertNotIn(threading.current_thread(), threads[:-1])
+        self.assertEqual(self.storage.queue_depth(), 0)
+        self.assertEqual(self.storage.pending_saves(), 0)
+        self.assertGreater(self.storage.last_flush_latency(), 0)
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 50)
+
+    def sharded_storage(self, buckets=0):
+        """returns a storage of the test_shards directory"""
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__dirty = set()
+        storage._FileStorage__cache = {}
+        storage.enable_shards("test_shards", buckets)
+        self.addCleanup(shutil.rmtree, "test_shards", True)
+        return storage
+
+    def test_shards_rewrite_dirty_only(self):
+        """Test a save only rewrites the shards of the changed objects"""
+        storage = self.sharded_storage()
+        user, place = User(id="1"), Place(id="2")
+        storage.new(user)
+        storage.new(place)
+        storage.save()
+        self.assertEqual(sorted(os.listdir("test_shards")),
+                         ["Place.json", "User.json"])
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertEqual(list(json.load(file)), ["User.1"])
+
+        place.name = "Loft"
+        storage.new(place)
+        with patch("models.engine.file_storage.atomic_open",
+                   wraps=atomic_open) as mock_open:
+            storage.save()
+        self.assertEqual([call.args[0] for call in mock_open.call_args_list],
+                         [os.path.join("test_shards", "Place.json")])
+        storage.delete(place)
+        storage.save()
+        self.assertEqual(os.listdir("test_shards"), ["User.json"])
+
+    def test_shards_failed_write(self):
+        """Test the shards of a failed write are written by the retry"""
+        storage = self.sharded_storage()
+        storage.new(User(id="1"))
+        storage.new(Place(id="2"))
+        with patch("models.engine.file_storage.atomic_open",
+                   side_effect=OSError(28, "")):
+            with self.assertRaises(OSError):
+                storage.flush()
+        self.assertEqual(storage.dirty_count(), 2)
+        storage.flush()
+        self.assertEqual(sorted(os.listdir("test_shards")),
+                         ["Place.json", "User.json"])
+        self.assertEqual(storage.dirty_count(), 0)
+
+    def test_shards_not_combined(self):
+        """Test shards refuse the journal and sharing"""
+        storage = self.sharded_storage()
+        self.assertRaises(ValueError, storage.enable_journal)
+        self.assertRaises(ValueError, storage.enable_sharing)
+        self.storage.enable_journal()
+        self.assertRaises(ValueError, self.storage.enable_shards,
+                          "test_shards")
+
+    def test_shards_lazy_load(self):
+        """Test a lazy reload reads a shard on first use of its class"""
+        storage = self.sharded_storage(buckets=4)
+        for n in range(20):
+            storage.new(Place(id=str(n), number_rooms=n))
+            storage.new(User(id=str(n)))
+        storage.save()
+        self.assertEqual(len(os.listdir("test_shards")), 8)
+
+        storage = self.sharded_storage(buckets=4)
+        with patch.object(FileStorage, "_FileStorage__load",
+                          autospec=True,
+                          side_effect=FileStorage._FileStorage__load) as load:
+            storage.reload(lazy=True)
+            self.assertEqual(load.call_count, 0)
+            self.assertEqual(storage.get(User, "3").id, "3")
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual(storage.count(User), 20)
+            self.assertEqual(load.call_count, 4)
+            storage.new(Place(id="3", number_rooms=99))
+            storage.save()
+            self.assertEqual(load.call_count, 5)
+            self.assertEqual(len(storage.select(
+                Place, ("number_rooms", ">", 10))), 10)
+            self.assertEqual(load.call_count, 8)
+        self.assertEqual(storage.get(Place, "3").number_rooms, 99)
+        self.assertEqual(storage.count(), 40)
+
+    def test_shards_is_loaded(self):
+        """Test is_loaded is False until the shard is read and built"""
+        storage = self.sharded_storage()
+        storage.new(User(id="1"))
+        storage.flush()
+        storage = self.sharded_storage()
+        storage.reload(lazy=True)
+        self.assertFalse(storage.is_loaded(User, "1"))
+        storage.count(User)
+        self.assertFalse(storage.is_loaded(User, "1"))
+        self.assertTrue(storage.is_loaded(User, "2"))
+        storage.get(User, "1")
+        self.assertTrue(storage.is_loaded("User", "1"))
+
+    def test_shards_parallel_reload(self):
+        """Test shards decoded by worker processes give the same objects"""
+        storage = self.sharded_storage(buckets=3)
+        objs = [cls() for cls in (User, Place, City) for _ in range(10)]
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+
+        storage = self.sharded_storage(buckets=3)
+        storage.new(User(id="kept"))
+        storage.reload(workers=2)
+        self.assertEqual(storage.count(), 31)
+        for obj in objs:
+            loaded = storage.get(type(obj), obj.id)
+            self.assertIsNot(loaded, obj)
+            self.assertEqual(loaded.to_dict(), obj.to_dict())
+        self.assertEqual(len(storage.lookup(City, state_id="")), 10)
+
+    def test_shards_import_with_workers_variable(self):
+        """Test importing models with HBNB_RELOAD_WORKERS set returns"""
+        storage = self.sharded_storage(buckets=3)
+        for n in range(10):
+            storage.new(User(id=str(n)))
+        storage.save()
+        env = dict(os.environ, HBNB_STORAGE_SHARDS="test_shards",
+                   HBNB_STORAGE_SHARD_BUCKETS="3", HBNB_RELOAD_WORKERS="3")
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "from models import storage; print(storage.count())"],
+            env=env, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, "10\n")
+
+    def test_export_import_jsonl(self):
+        """Test a JSON Lines round trip saves once at the end"""
+        self.addCleanup(os.remove, "test_export.jsonl")
+        objs = [User(email=f"{n}@mail.com") for n in range(5)]
+        objs.append(Place(name="Loft"))
+        for obj in objs:
+            self.storage.new(obj)
+        self.assertEqual(self.storage.export_jsonl("test_export.jsonl"), 6)
+        self.assertEqual(
+            self.storage.export_jsonl(StringIO(), Place), 1)
+
+        self.storage._FileStorage__objects = {}
+        with patch.object(self.storage, "flush",
+                          wraps=self.storage.flush) as mock_flush:
+            self.assertEqual(
+                self.storage.import_jsonl("test_export.jsonl"), 6)
+        self.assertEqual(mock_flush.call_count, 1)
+        for obj in objs:
+            self.assertEqual(self.storage.get(type(obj), obj.id).to_dict(),
+                             obj.to_dict())
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 6)
+
+    def test_import_jsonl_rollback(self):
+        """Test an unknown class rolls the import back"""
+        user = User(id="1", email="old@mail.com")
+        self.storage.new(user)
+        lines = [json.dumps({"__class__": "User", "id": "1",
+                             "email": "new@mail.com"}),
+                 json.dumps({"__class__": "User", "id": "2"}),
+                 json.dumps({"__class__": "MyModel", "id": "3"})]
+        with self.assertRaisesRegex(ValueError, "record 3: unknown class"):
+            self.storage.import_jsonl(StringIO("\n".join(lines)))
+        self.assertIs(self.storage.get(User, "1"), user)
+        self.assertEqual(list(self.storage.all()), ["User.1"])
+        self.assertFalse(os.path.exists(self.file_path))
+
+    def test_import_jsonl_invalid_fields(self):
+        """Test records with an id or dates of the wrong type are errors"""
+        for record in ({"created_at": 5}, {"updated_at": "yesterday"},
+                       {"id": 7}):
+            record["__class__"] = "User"
+            with self.assertRaisesRegex(ValueError, "record 1: "):
+                self.storage.import_jsonl(StringIO(json.dumps(record)))
+        self.assertEqual(self.storage.count(), 0)
+
+    def test_import_jsonl_rollback_lazy_shards(self):
+        """Test a rollback keeps objects of shards not yet read"""
+        storage = self.sharded_storage()
+        storage.new(User(id="1", email="old@mail.com"))
+        storage.flush()
+        storage = self.sharded_storage()
+        storage.reload(lazy=True)
+        lines = [json.dumps({"__class__": "User", "id": "1",
+                             "email": "new@mail.com"}),
+                 json.dumps({"__class__": "MyModel", "id": "3"})]
+        with self.assertRaises(ValueError):
+            storage.import_jsonl(StringIO("\n".join(lines)))
+        self.assertEqual(storage.get(User, "1").email, "old@mail.com")
+        storage.flush()
+        self.assertEqual(os.listdir("test_shards"), ["User.json"])
+
     def test_reload_invalid_json(self):
         """Test reload method with invalid JSON"""
         with open(self.file_path, "w") as file:
@@ -71,5 +1025,19 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(len(reloaded_objects), 0)
 
 
+def _save_from_process(file_path, prefix, count):
+    """creates and saves count objects in a storage of file_path"""
+    storage = FileStorage()
+    storage._FileStorage__objects = {}
+    storage._FileStorage__file_path = file_path
+    storage._FileStorage__dirty = set()
+    storage._FileStorage__cache = {}
+    storage.enable_sharing()
+    storage.reload()
+    for n in range(count):
+        storage.new(BaseModel(id=f"{prefix}{n}"))
+        storage.save()
+
+
 if __name__ == "__main__":
     unittest.main()
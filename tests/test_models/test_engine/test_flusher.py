@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Unit tests for the `flusher` module."""
+import threading
+import time
+import unittest
+from models.engine.flusher import BackgroundFlusher
+
+
+class TestBackgroundFlusher(unittest.TestCase):
+    """Test cases for the `BackgroundFlusher` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.calls = 0
+        self.release = threading.Event()
+        self.flusher = BackgroundFlusher(self.flush)
+
+    def tearDown(self):
+        """Clean up after testing"""
+        self.release.set()
+        self.flusher.close()
+
+    def flush(self):
+        """counts the writes, blocking until released"""
+        self.calls += 1
+        self.release.wait()
+
+    def test_coalesce(self):
+        """Test requests made during a write are grouped into one"""
+        self.flusher.request()
+        while not self.calls:
+            time.sleep(0.001)
+        for _ in range(10):
+            self.flusher.request()
+        self.assertEqual(self.flusher.depth(), 10)
+        self.release.set()
+        self.flusher.wait()
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.flusher.depth(), 0)
+
+    def test_close_writes_pending(self):
+        """Test close runs the waiting requests before stopping"""
+        self.release.set()
+        self.flusher.request()
+        self.flusher.close()
+        self.assertEqual(self.calls, 1)
+        with self.assertRaises(ValueError):
+            self.flusher.request()
+
+    def test_error(self):
+        """Test a failed write is raised once by wait"""
+        def fail():
+            raise OSError("disk full")
+        flusher = BackgroundFlusher(fail)
+        flusher.request()
+        with self.assertRaises(OSError):
+            flusher.wait()
+        flusher.wait()
+        flusher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
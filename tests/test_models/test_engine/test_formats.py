@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""Unit tests for the `formats` module."""
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from io import StringIO
+from models.base_model import BaseModel
+from models.engine.formats import BinaryFormat, JSONFormat, convert
+from models.engine.formats import JSONLinesFormat
+from models.engine.formats import get_format
+
+
+class TestFormats(unittest.TestCase):
+    """Test cases for the storage file formats."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.obj = BaseModel()
+        self.obj.name = "My First Model"
+        self.key = f"BaseModel.{self.obj.id}"
+        self.paths = ["test_formats.json", "test_formats.bin",
+                      "test_formats_back.json"]
+
+    def tearDown(self):
+        """Clean up after testing"""
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_get_format(self):
+        """Test formats are looked up by name"""
+        self.assertIsInstance(get_format("json"), JSONFormat)
+        self.assertIsInstance(get_format("binary"), BinaryFormat)
+        with self.assertRaises(ValueError):
+            get_format("xml")
+
+    def test_binary_keeps_native_datetimes(self):
+        """Test binary records hold datetimes, not ISO strings"""
+        key, record = BinaryFormat().encode(self.key, self.obj)
+        self.assertEqual(key, self.key)
+        self.assertIsInstance(record["created_at"], datetime)
+        self.assertEqual(record["__class__"], "BaseModel")
+
+        key, record = BinaryFormat().encode(self.key, self.obj.to_dict())
+        self.assertEqual(record["updated_at"], self.obj.updated_at)
+
+    def test_binary_round_trip(self):
+        """Test a binary file reads back the written records"""
+        fmt = BinaryFormat()
+        with open(self.paths[1], "wb") as file:
+            fmt.write(file, [fmt.encode(self.key, self.obj)])
+        with open(self.paths[1], "rb") as file:
+            records = dict(fmt.read(file))
+        obj = BaseModel(**records[self.key])
+        self.assertEqual(obj.to_dict(), self.obj.to_dict())
+
+    def test_binary_refuses_globals(self):
+        """Test the reader does not unpickle arbitrary objects"""
+        with open(self.paths[1], "wb") as file:
+            pickle.dump({"BaseModel.1": BaseModel}, file)
+        with open(self.paths[1], "rb") as file:
+            with self.assertRaises(pickle.UnpicklingError):
+                dict(BinaryFormat().read(file))
+
+    def test_convert_both_ways(self):
+        """Test json -> binary -> json keeps every record"""
+        with open(self.paths[0], "w") as file:
+            json.dump({self.key: self.obj.to_dict()}, file)
+        convert(self.paths[0], "json", self.paths[1], "binary")
+        convert(self.paths[1], "binary", self.paths[2], "json")
+        with open(self.paths[2]) as file:
+            self.assertEqual(json.load(file), {self.key: self.obj.to_dict()})
+
+    def test_jsonl_round_trip(self):
+        """Test JSON Lines write one record per line and read them back"""
+        fmt = JSONLinesFormat()
+        file = StringIO()
+        fmt.write(file, [fmt.encode(self.key, self.obj),
+                         fmt.encode("User.2", {"__class__": "User",
+                                               "id": "2"})])
+        self.assertEqual(len(file.getvalue().splitlines()), 2)
+        file.seek(0)
+        self.assertEqual(list(fmt.read(file)),
+                         [(self.key, self.obj.to_dict()),
+                          ("User.2", {"__class__": "User", "id": "2"})])
+
+    def test_jsonl_errors(self):
+        """Test malformed lines are reported with their number"""
+        fmt = JSONLinesFormat()
+        for text, message in (('{"__class__": "User"}\n{', "line 2"),
+                              ('\n[1]', "line 2: record without"),
+                              ('{"id": "1"}', "line 1: record without")):
+            with self.assertRaisesRegex(ValueError, message):
+                list(fmt.read(StringIO(text)))
+
+    def test_convert_jsonl(self):
+        """Test json -> jsonl keeps every record"""
+        self.paths.append("test_formats.jsonl")
+        with open(self.paths[0], "w") as file:
+            json.dump({self.key: self.obj.to_dict()}, file)
+        convert(self.paths[0], "json", self.paths[3], "jsonl")
+        with open(self.paths[3]) as file:
+            self.assertEqual(json.loads(file.readline()),
+                             self.obj.to_dict())
+
+    def test_convert_script(self):
+        """Test the converter script does not import the models package,
+        which would fail here on the unknown HBNB_STORAGE_FORMAT"""
+        script = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                              "convert_storage.py")
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "in.json"), "w") as file:
+                json.dump({self.key: self.obj.to_dict()}, file)
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(script), "in.json",
+                 "out.bin"], cwd=directory, capture_output=True, text=True,
+                env=dict(os.environ, HBNB_STORAGE_FORMAT="xml"), timeout=60)
+            self.assertEqual((result.returncode, result.stderr), (0, ""))
+            with open(os.path.join(directory, "out.bin"), "rb") as file:
+                self.assertEqual([key for key, _ in
+                                  BinaryFormat().read(file)], [self.key])
+
+
+if __name__ == "__main__":
+    unittest.main()
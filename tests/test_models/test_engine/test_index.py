@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Unit tests for the `index` module."""
+import unittest
+from models.engine.index import AttributeIndex, ClassIndex
+
+
+class TestClassIndex(unittest.TestCase):
+    """Test cases for the `ClassIndex` class."""
+
+    def test_add_remove(self):
+        """Test keys are grouped by class name"""
+        index = ClassIndex()
+        index.add("User.1")
+        index.add("User.2")
+        index.add("User.1")
+        index.add("UserProfile.1")
+        self.assertEqual(index.size, 3)
+        self.assertEqual(list(index.keys("User")), ["User.1", "User.2"])
+        self.assertEqual(index.count("UserProfile"), 1)
+        index.remove("User.1")
+        index.remove("User.1")
+        index.remove("Place.1")
+        self.assertEqual(index.size, 2)
+        self.assertEqual(list(index.keys("User")), ["User.2"])
+        self.assertEqual(index.count("Place"), 0)
+        self.assertEqual(list(index.keys("Place")), [])
+
+    def test_keys_after(self):
+        """Test iterating from a key, also after removed keys"""
+        index = ClassIndex()
+        for n in range(200):
+            index.add(f"User.{n}")
+        self.assertEqual(list(index.keys_after("User"))[:2],
+                         ["User.0", "User.1"])
+        keys = index.keys_after("User", "User.197")
+        for n in range(150):
+            index.remove(f"User.{n}")
+        self.assertEqual(list(keys), ["User.198", "User.199"])
+        index.remove("User.160")
+        self.assertEqual(list(index.keys_after("User", "User.158")),
+                         ["User.159"] + [f"User.{n}" for n in range(161, 200)])
+        self.assertEqual(list(index.keys_after("User", "User.199")), [])
+        self.assertEqual(list(index.keys_after("Place")), [])
+        with self.assertRaises(KeyError):
+            index.keys_after("User", "User.1")
+
+
+class TestAttributeIndex(unittest.TestCase):
+    """Test cases for the `AttributeIndex` class."""
+
+    def test_add_move_remove(self):
+        """Test keys follow their attribute value"""
+        index = AttributeIndex("City", "state_id")
+        index.add("City.1", "s1")
+        index.add("City.2", "s1")
+        self.assertEqual(list(index.keys("s1")), ["City.1", "City.2"])
+        index.add("City.1", "s2")
+        self.assertEqual(list(index.keys("s1")), ["City.2"])
+        self.assertEqual(list(index.keys("s2")), ["City.1"])
+        index.remove("City.2")
+        index.remove("City.2")
+        self.assertEqual(list(index.keys("s1")), [])
+
+    def test_unhashable(self):
+        """Test unhashable values are left out of the index"""
+        index = AttributeIndex("Place", "amenity_ids")
+        index.add("Place.1", ["a"])
+        self.assertEqual(list(index.keys(["a"])), [])
+        index.remove("Place.1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Unit tests for the `journal` module."""
+import json
+import os
+import unittest
+from models.engine.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for the `Journal` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.file_path = "test_journal.json"
+        self.journal = Journal(self.file_path, threshold=1 << 20)
+
+    def tearDown(self):
+        """Clean up after testing"""
+        for path in (self.file_path, self.journal.log_path,
+                     self.journal.frozen_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_append_and_read(self):
+        """Test records are replayed in order"""
+        self.journal.append([("BaseModel.1", {"id": "1"}),
+                             ("BaseModel.2", {"id": "2"})])
+        self.journal.append([("BaseModel.1", None)])
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(self.journal.read(), {"BaseModel.2": {"id": "2"}})
+
+    def test_read_snapshot_and_log(self):
+        """Test the log tail is applied on top of the snapshot"""
+        with open(self.file_path, "w") as file:
+            json.dump({"BaseModel.1": {"id": "1"}}, file)
+        self.journal.append([("BaseModel.1", {"id": "1", "a": 1})])
+        self.assertEqual(self.journal.read(),
+                         {"BaseModel.1": {"id": "1", "a": 1}})
+
+    def test_torn_tail(self):
+        """Test a partially written last record is ignored"""
+        self.journal.append([("BaseModel.1", {"id": "1"})])
+        with open(self.journal.log_path, "a") as file:
+            file.write('{"op": "set", "key": "BaseMo')
+        self.assertEqual(self.journal.read(), {"BaseModel.1": {"id": "1"}})
+
+    def test_append_after_torn_tail(self):
+        """Test records appended after a torn write are kept"""
+        self.journal.append([("BaseModel.1", {"id": "1"})])
+        with open(self.journal.log_path, "a") as file:
+            file.write('{"op": "set", "key": "BaseMo')
+        self.journal.append([("BaseModel.2", {"id": "2"})])
+        self.journal.append([("BaseModel.3", {"id": "3"})])
+        self.assertEqual(list(self.journal.read()),
+                         ["BaseModel.1", "BaseModel.2", "BaseModel.3"])
+
+    def test_corrupt_record(self):
+        """Test an unreadable record before the tail is an error"""
+        self.journal.append([("BaseModel.1", {"id": "1"})])
+        with open(self.journal.log_path, "a") as file:
+            file.write('{"op": "set"\n')
+        with open(self.journal.log_path, "a") as file:
+            file.write(json.dumps({"op": "del", "key": "BaseModel.1"}))
+        with self.assertRaises(ValueError):
+            self.journal.read()
+
+    def test_compact(self):
+        """Test compaction folds the log into the snapshot"""
+        self.journal.append([("BaseModel.1", {"id": "1"})])
+        self.journal.compact(wait=True)
+        self.assertFalse(os.path.exists(self.journal.log_path))
+        self.assertFalse(os.path.exists(self.journal.frozen_path))
+        with open(self.file_path) as file:
+            self.assertEqual(json.load(file), {"BaseModel.1": {"id": "1"}})
+        self.assertEqual(self.journal.read(), {"BaseModel.1": {"id": "1"}})
+
+    def test_threshold(self):
+        """Test passing the threshold triggers a compaction"""
+        self.journal.threshold = 1
+        self.journal.append([("BaseModel.1", {"id": "1"})])
+        self.journal.compact(wait=True)
+        with open(self.file_path) as file:
+            self.assertIn("BaseModel.1", json.load(file))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Unit tests for the `json_stream` module."""
+import io
+import json
+import unittest
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """Test cases for the `iter_items` function."""
+
+    def items(self, text, chunk_size=3):
+        """returns the list of pairs parsed from text"""
+        return list(iter_items(io.StringIO(text), chunk_size))
+
+    def test_empty_object(self):
+        """Test an empty document yields nothing"""
+        self.assertEqual(self.items("{}"), [])
+        self.assertEqual(self.items("  { \n } "), [])
+
+    def test_matches_json_load(self):
+        """Test pairs match json.load for small chunk sizes"""
+        doc = {
+            "BaseModel.1": {"id": "1", "__class__": "BaseModel",
+                            "created_at": "2022-01-01T12:00:00"},
+            "Place.2": {"number_rooms": 12345, "latitude": -1.5e-3,
+                        "amenity_ids": ["a", "b"], "name": "x}\\\"y,"},
+            "User.3": {"flag": True, "none": None},
+        }
+        text = json.dumps(doc, indent=2)
+        for chunk_size in (1, 2, 7, 1 << 16):
+            self.assertEqual(dict(self.items(text, chunk_size)), doc)
+
+    def test_number_across_chunks(self):
+        """Test a number split over two chunks is read whole"""
+        self.assertEqual(self.items('{"a": 123456}', 8), [("a", 123456)])
+
+    def test_lazy(self):
+        """Test the first pair is available before the end is read"""
+        stream = io.StringIO('{"a": 1, "b": ' + "x" * 100)
+        pairs = iter_items(stream, 4)
+        self.assertEqual(next(pairs), ("a", 1))
+        with self.assertRaises(ValueError):
+            next(pairs)
+
+    def test_invalid(self):
+        """Test invalid documents raise ValueError"""
+        for text in ("invalid_json", "[1, 2]", '{"a" 1}', '{"a": 1',
+                     '{1: 2}', ""):
+            with self.assertRaises(ValueError):
+                self.items(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Unit tests for the `lazy_objects` module."""
+import threading
+import unittest
+from time import sleep
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.lazy_objects import LazyObjects
+
+
+class TestLazyObjects(unittest.TestCase):
+    """Test cases for the `LazyObjects` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.record = BaseModel().to_dict()
+        self.key = f"BaseModel.{self.record['id']}"
+        self.objects = LazyObjects({"BaseModel": BaseModel},
+                                   {self.key: self.record})
+
+    def test_keys_do_not_build(self):
+        """Test key lookups leave the raw record in place"""
+        with patch.object(BaseModel, "__init__") as mock_init:
+            self.assertIn(self.key, self.objects)
+            self.assertEqual(len(self.objects), 1)
+            self.assertEqual(list(self.objects), [self.key])
+        self.assertFalse(mock_init.called)
+        self.assertFalse(self.objects.is_loaded(self.key))
+        self.assertIs(self.objects.raw(self.key), self.record)
+
+    def test_getitem_builds_once(self):
+        """Test the instance is built on first access and then kept"""
+        obj = self.objects[self.key]
+        self.assertIsInstance(obj, BaseModel)
+        self.assertEqual(obj.to_dict(), self.record)
+        self.assertTrue(self.objects.is_loaded(self.key))
+        self.assertIs(self.objects[self.key], obj)
+        self.assertIs(self.objects.get(self.key), obj)
+
+    def test_views_build(self):
+        """Test values() and items() return instances"""
+        self.assertIsInstance(list(self.objects.values())[0], BaseModel)
+        key, obj = list(self.objects.items())[0]
+        self.assertEqual(key, self.key)
+        self.assertIsInstance(obj, BaseModel)
+
+    def test_pop(self):
+        """Test pop returns an instance and removes the key"""
+        self.assertIsInstance(self.objects.pop(self.key), BaseModel)
+        self.assertNotIn(self.key, self.objects)
+        self.assertIsNone(self.objects.pop(self.key, None))
+        self.assertIsNone(self.objects.get(self.key))
+
+    def test_copy_shares_instances(self):
+        """Test a copy reuses the instances built in the source"""
+        copy = self.objects.copy()
+        obj = self.objects[self.key]
+        self.assertTrue(copy.is_loaded(self.key))
+        self.assertIs(copy[self.key], obj)
+        other = LazyObjects({"BaseModel": BaseModel},
+                            {self.key: self.record})
+        copy = other.copy()
+        self.assertIs(copy[self.key], other[self.key])
+        self.assertEqual(copy, other)
+
+    def test_concurrent_access_builds_once(self):
+        """Test threads reading a key at once all get the stored instance"""
+        def slow_build(**record):
+            sleep(0.01)
+            return BaseModel(**record)
+        objects = LazyObjects({"BaseModel": slow_build},
+                              {self.key: self.record})
+        copy = objects.copy()
+        barrier = threading.Barrier(8)
+        built = []
+
+        def read(mapping):
+            barrier.wait()
+            built.append(mapping[self.key])
+        threads = [threading.Thread(target=read, args=(mapping,))
+                   for mapping in [objects, copy] * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(obj) for obj in built}), 1)
+        self.assertIs(built[0], objects[self.key])
+
+
+if __name__ == "__main__":
+    unittest.main()
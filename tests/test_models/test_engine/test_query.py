@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Unit tests for the `query` module."""
+import unittest
+from models.engine.query import compile_predicates, matches, ordered
+
+
+class Row:
+    """Object with the given attributes"""
+
+    def __init__(self, **attributes):
+        """Sets the attributes"""
+        self.__dict__.update(attributes)
+
+
+class TestQuery(unittest.TestCase):
+    """Test cases for the query helpers."""
+
+    def test_matches(self):
+        """Test every check must hold, incomparable values never do"""
+        checks = compile_predicates([("a", ">", 1), ("b", "==", "x")])
+        read = getattr
+        self.assertTrue(matches(Row(a=2, b="x"), checks, read))
+        self.assertFalse(matches(Row(a=1, b="x"), checks, read))
+        self.assertFalse(matches(Row(a="2", b="x"), checks, read))
+        self.assertTrue(matches(Row(), [], read))
+        with self.assertRaisesRegex(ValueError, "unknown operator: ~"):
+            compile_predicates([("a", "~", 1)])
+
+    def test_ordered(self):
+        """Test ascending, descending and stable multi-key order"""
+        rows = [Row(n=n, a=a, b=b) for n, (a, b) in enumerate(
+            [(1, "y"), (2, "x"), (1, "x"), (2, "x")])]
+        self.assertEqual([row.n for row in ordered(rows, ["a", "-b"])],
+                         [0, 2, 1, 3])
+        self.assertEqual([row.n for row in ordered(rows, ["-a"], 3)],
+                         [1, 3, 0])
+        self.assertEqual([row.n for row in ordered(iter(rows), ["b"], 2)],
+                         [1, 2])
+        with self.assertRaisesRegex(ValueError, "cannot order by a"):
+            ordered(rows + [Row(a="1")], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
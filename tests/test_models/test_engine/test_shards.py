@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""Unit tests for the `shards` module."""
+import os
+import shutil
+import unittest
+from models.engine.shards import ShardLayout
+
+
+class TestShardLayout(unittest.TestCase):
+    """Test cases for the `ShardLayout` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.directory = "test_shards"
+        os.makedirs(self.directory, exist_ok=True)
+
+    def tearDown(self):
+        """Clean up after testing"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_shard_of(self):
+        """Test keys go to their class, then to a stable bucket"""
+        layout = ShardLayout(self.directory)
+        self.assertEqual(layout.shard_of("Place.a.b"), "Place")
+        layout = ShardLayout(self.directory, buckets=4)
+        shard = layout.shard_of("Place.1234")
+        self.assertRegex(shard, r"^Place\.[0-3]$")
+        self.assertEqual(layout.shard_of("Place.1234"), shard)
+        self.assertEqual(ShardLayout.class_of(shard), "Place")
+        buckets = {layout.shard_of(f"User.{n}") for n in range(100)}
+        self.assertEqual(len(buckets), 4)
+
+    def test_paths(self):
+        """Test shard files are listed from their extension"""
+        layout = ShardLayout(self.directory, extension=".bin")
+        self.assertEqual(layout.path("User"),
+                         os.path.join(self.directory, "User.bin"))
+        for name in ("User.bin", "Place.2.bin", "User.bin.1",
+                     "User.bin.tmp12", "User.json"):
+            open(os.path.join(self.directory, name), "w").close()
+        self.assertEqual(layout.shards(), ["Place.2", "User"])
+        self.assertEqual(ShardLayout("missing").shards(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Unit tests for the `snapshot` module."""
+import unittest
+from models.base_model import BaseModel
+from models.engine.lazy_objects import LazyObjects
+from models.engine.snapshot import LazySnapshot, Snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test cases for the `Snapshot` and `LazySnapshot` classes."""
+
+    def assertReadOnly(self, snapshot, key):
+        """checks every way of changing snapshot raises TypeError"""
+        changes = (lambda: snapshot.__setitem__(key, None),
+                   lambda: snapshot.__delitem__(key),
+                   lambda: snapshot.pop(key),
+                   snapshot.popitem, snapshot.clear,
+                   lambda: snapshot.update({key: None}),
+                   lambda: snapshot.setdefault("other", None))
+        for change in changes:
+            with self.assertRaises(TypeError):
+                change()
+        self.assertIn(key, snapshot)
+
+    def test_snapshot(self):
+        """Test a snapshot reads like a dict and cannot be changed"""
+        obj = BaseModel()
+        snapshot = Snapshot({"BaseModel.1": obj})
+        self.assertIsInstance(snapshot, dict)
+        self.assertIs(snapshot["BaseModel.1"], obj)
+        self.assertReadOnly(snapshot, "BaseModel.1")
+        copy = snapshot.copy()
+        copy["BaseModel.2"] = obj
+        self.assertEqual(len(snapshot), 1)
+
+    def test_lazy_snapshot(self):
+        """Test a lazy snapshot builds on access and cannot be changed"""
+        record = BaseModel().to_dict()
+        objects = LazyObjects({"BaseModel": BaseModel},
+                              {"BaseModel.1": record})
+        snapshot = LazySnapshot(objects.classes, dict.items(objects),
+                                source=objects)
+        self.assertReadOnly(snapshot, "BaseModel.1")
+        self.assertFalse(snapshot.is_loaded("BaseModel.1"))
+        self.assertIs(snapshot["BaseModel.1"], objects["BaseModel.1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Unit tests for the `spatial` module."""
+import random
+import unittest
+from models.engine.spatial import GeoGrid, distance
+
+
+class TestGeoGrid(unittest.TestCase):
+    """Test cases for the `GeoGrid` class."""
+
+    def setUp(self):
+        """Set up for testing"""
+        self.grid = GeoGrid("Place")
+        self.points = {}
+        rand = random.Random(12)
+        for n in range(2000):
+            point = (rand.uniform(-90, 90), rand.uniform(-180, 180))
+            self.points[f"Place.{n}"] = point
+            self.grid.add(f"Place.{n}", *point)
+
+    def scan(self, latitude, longitude, radius):
+        """returns the keys within radius computed over every point"""
+        return sorted(key for key, point in self.points.items()
+                      if distance(latitude, longitude, *point) <= radius)
+
+    def test_distance(self):
+        """Test the haversine distance"""
+        self.assertAlmostEqual(distance(48.8566, 2.3522, 51.5072, -0.1276),
+                               343.5, delta=0.5)
+        self.assertAlmostEqual(distance(0, 179.5, 0, -179.5),
+                               distance(0, 0, 0, 1))
+
+    def test_near_matches_scan(self):
+        """Test radius queries against a scan, across the antimeridian
+        and around the poles"""
+        for latitude, longitude, radius in ((0, 0, 800), (10, 179.9, 1500),
+                                            (-10, -179.9, 1500),
+                                            (88, 40, 900), (-89, 0, 300),
+                                            (30, 60, 30000)):
+            hits = self.grid.near(latitude, longitude, radius)
+            self.assertEqual(sorted(key for _, key in hits),
+                             self.scan(latitude, longitude, radius))
+            self.assertEqual(hits, sorted(hits))
+
+    def test_nearest(self):
+        """Test the nearest points are the first ones of a full scan"""
+        for latitude, longitude in ((0, 0), (89.9, 10), (-5, 180)):
+            expected = sorted((distance(latitude, longitude, *point), key)
+                              for key, point in self.points.items())
+            self.assertEqual(self.grid.nearest(latitude, longitude, 5),
+                             expected[:5])
+        self.assertEqual(self.grid.nearest(0, 0, 0), [])
+        self.assertEqual(len(self.grid.nearest(0, 0, 5000)), 2000)
+
+    def test_within(self):
+        """Test bounding boxes, including one crossing the antimeridian"""
+        for south, west, north, east in ((-10, -20, 10, 20),
+                                         (40, 170, 60, -170)):
+            expected = sorted(
+                key for key, (lat, lon) in self.points.items()
+                if south <= lat <= north
+                and (west <= lon <= east if west <= east
+                     else lon >= west or lon <= east))
+            self.assertEqual(
+                sorted(self.grid.within(south, west, north, east)), expected)
+        self.assertEqual(len(self.grid.within(-90, -180, 90, 180)), 2000)
+
+    def test_add_move_remove(self):
+        """Test points move on update and leave on remove"""
+        grid = GeoGrid("Place")
+        grid.add("Place.1", 48.86, 2.34)
+        grid.add("Place.1", 45.76, 4.84)
+        self.assertEqual(grid.within(48, 2, 49, 3), [])
+        self.assertEqual(grid.within(45, 4, 46, 5), ["Place.1"])
+        grid.add("Place.2", "n/a", 4.84)
+        grid.add("Place.3", 95, 4.84)
+        self.assertEqual(len(grid), 1)
+        grid.remove("Place.1")
+        grid.remove("Place.1")
+        self.assertEqual(len(grid), 0)
+        self.assertEqual(grid.nearest(45, 4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()